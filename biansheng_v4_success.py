@@ -1,7 +1,7 @@
 ## 向右打结一次：压在上面的绳子尾端水平向右
 ## 向左打结一次：压在上面的绳子尾端水平向左
 
-def generate_knot_methods(start_state, composition_color):
+def generate_knot_methods(start_state, composition_color, quiet=False):
     """
     生成编绳结的方式，使得绳子颜色排列符合 composition_color，
     且最终绳子物理排列顺序与 start_state 相同。
@@ -12,6 +12,7 @@ def generate_knot_methods(start_state, composition_color):
         start_state (list): 初始多股绳子的颜色排列顺序，例如 ['R', 'B', 'G', 'Y']。
         composition_color (list of list): 目标绳结颜色排列方式，例如
                                         [['R', 'G'], ['B', 'Y']]。
+        quiet (bool): 为 True 时不在控制台输出任何内容，只返回结果，供服务端等调用方使用。
 
     Returns:
         list of list: 与 composition_color 对应的打结方式 (compositon_method)，
@@ -139,7 +140,8 @@ def generate_knot_methods(start_state, composition_color):
 
         return find_knots_for_current_line(0, current_state)
 
-    print("\n--- 绳结生成过程 ---")
+    if not quiet:
+        print("\n--- 绳结生成过程 ---")
     
     # 调用 backtrack，并接收返回的 states_path
     found_solution, step_by_step_states = backtrack(0, list(start_state), []) 
@@ -150,78 +152,82 @@ def generate_knot_methods(start_state, composition_color):
             for c_idx, knot_type_abbr in enumerate(row):
                 final_composition_method[r_idx][c_idx] = knot_mapping_symbols[knot_type_abbr]
         
-        print(f"初始状态: {step_by_step_states[0]}")
-        for i in range(len(final_composition_method)):
-            print(f"第 {i+1} 行打结方式: {final_composition_method[i]}")
-            # 这里的 i+1 是因为 step_by_step_states[0] 是初始状态
-            # final_composition_method[i] 对应的是第 i+1 次打结后的状态 (step_by_step_states[i+1])
-            print(f"更新后状态: {step_by_step_states[i+1]}") 
+        if not quiet:
+            print(f"初始状态: {step_by_step_states[0]}")
+            for i in range(len(final_composition_method)):
+                print(f"第 {i+1} 行打结方式: {final_composition_method[i]}")
+                # 这里的 i+1 是因为 step_by_step_states[0] 是初始状态
+                # final_composition_method[i] 对应的是第 i+1 次打结后的状态 (step_by_step_states[i+1])
+                print(f"更新后状态: {step_by_step_states[i+1]}") 
         
-        print(f"结束状态 (end_state): {calculated_end_state}")
-        print(f"与初始状态一致: {calculated_end_state == start_state}")
-        print("---------------------\n")
+            print(f"结束状态 (end_state): {calculated_end_state}")
+            print(f"与初始状态一致: {calculated_end_state == start_state}")
+            print("---------------------\n")
 
         return final_composition_method
     else:
-        print("未能找到符合条件的打结方式。")
-        print("---------------------\n")
+        if not quiet:
+            print("未能找到符合条件的打结方式。")
+            print("---------------------\n")
         return None
 
 
-# 示例 1: 简单的例子
-start_state_1 = ['R', 'B', 'G', 'Y']
-composition_color_1 = [['R', 'G'], ['B']] 
-
-print(f"Start State 1: {start_state_1}")
-print(f"Composition Color 1: {composition_color_1}")
-composition_method_1 = generate_knot_methods(start_state_1, composition_color_1)
-
-if composition_method_1:
-    print(f"最终 Composition Method 1:\n {composition_method_1}")
-else:
-    print("未能找到符合条件的打结方式。")
-
-print("-" * 30)
-
-# 示例 2：复杂例子
-# 在复杂例子中虽然生成的不是最优解（最方便记忆的传统解），但是是正确的
-# 生成最优解的代码等待进一步更新
-start_state_2 = ['R','R','W','W','R','R'] 
-composition_color_2 = [
-    ['R', 'W', 'R'], 
-    ['R','R'],     
-    ['R', 'W', 'R'],
-    ['W','W'],
-    ['R', 'W', 'R'],
-    ['R','R']
-]
-print(f"Start State 2: {start_state_2}")
-print(f"Composition Color 2: {composition_color_2}")
-composition_method_2 = generate_knot_methods(start_state_2, composition_color_2)
-
-if composition_method_2:
-    print(f"最终 Composition Method 2:\n {composition_method_2}")
-else:
-    print("未能找到符合条件的打结方式。")
-
-# 示例2 结果：
-# --- 绳结生成过程 ---
-# 初始状态: ['R', 'R', 'W', 'W', 'R', 'R']
-# 第 1 行打结方式: ['右右', '右右', '右右']
-# 更新后状态: ['R', 'W', 'R', 'W', 'R', 'R']
-# 第 2 行打结方式: ['右右', '左右']
-# 更新后状态: ['R', 'W', 'R', 'W', 'R', 'R']
-# 第 3 行打结方式: ['右左', '左右', '右右']
-# 更新后状态: ['R', 'R', 'W', 'R', 'W', 'R']
-# 第 4 行打结方式: ['右右', '右右']
-# 更新后状态: ['R', 'R', 'W', 'R', 'W', 'R']
-# 第 5 行打结方式: ['右右', '右左', '左右']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
-# 第 6 行打结方式: ['右左', '右右']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
-# 结束状态 (end_state): ['R', 'R', 'W', 'W', 'R', 'R']
-# 与初始状态一致: True
+def main():
+    # 直接运行脚本时才执行示例，import 本模块不会触发任何计算
+    # 示例 1: 简单的例子
+    start_state_1 = ['R', 'B', 'G', 'Y']
+    composition_color_1 = [['R', 'G'], ['B']] 
 
+    print(f"Start State 1: {start_state_1}")
+    print(f"Composition Color 1: {composition_color_1}")
+    composition_method_1 = generate_knot_methods(start_state_1, composition_color_1)
 
+    if composition_method_1:
+        print(f"最终 Composition Method 1:\n {composition_method_1}")
+    else:
+        print("未能找到符合条件的打结方式。")
 
+    print("-" * 30)
+
+    # 示例 2：复杂例子
+    # 在复杂例子中虽然生成的不是最优解（最方便记忆的传统解），但是是正确的
+    # 生成最优解的代码等待进一步更新
+    start_state_2 = ['R','R','W','W','R','R'] 
+    composition_color_2 = [
+        ['R', 'W', 'R'], 
+        ['R','R'],     
+        ['R', 'W', 'R'],
+        ['W','W'],
+        ['R', 'W', 'R'],
+        ['R','R']
+    ]
+    print(f"Start State 2: {start_state_2}")
+    print(f"Composition Color 2: {composition_color_2}")
+    composition_method_2 = generate_knot_methods(start_state_2, composition_color_2)
+
+    if composition_method_2:
+        print(f"最终 Composition Method 2:\n {composition_method_2}")
+    else:
+        print("未能找到符合条件的打结方式。")
 
+    # 示例2 结果：
+    # --- 绳结生成过程 ---
+    # 初始状态: ['R', 'R', 'W', 'W', 'R', 'R']
+    # 第 1 行打结方式: ['右右', '右右', '右右']
+    # 更新后状态: ['R', 'W', 'R', 'W', 'R', 'R']
+    # 第 2 行打结方式: ['右右', '左右']
+    # 更新后状态: ['R', 'W', 'R', 'W', 'R', 'R']
+    # 第 3 行打结方式: ['右左', '左右', '右右']
+    # 更新后状态: ['R', 'R', 'W', 'R', 'W', 'R']
+    # 第 4 行打结方式: ['右右', '右右']
+    # 更新后状态: ['R', 'R', 'W', 'R', 'W', 'R']
+    # 第 5 行打结方式: ['右右', '右左', '左右']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
+    # 第 6 行打结方式: ['右左', '右右']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
+    # 结束状态 (end_state): ['R', 'R', 'W', 'W', 'R', 'R']
+    # 与初始状态一致: True
+
+
+if __name__ == '__main__':
+    main()
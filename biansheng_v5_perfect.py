@@ -3,7 +3,7 @@
 
 import math
 
-def generate_knot_methods(start_state, composition_color):
+def generate_knot_methods(start_state, composition_color, quiet=False):
     """
     生成编绳结的方式，使得绳子颜色排列符合 composition_color，
     且最终绳子物理排列顺序与 start_state 相同。
@@ -15,6 +15,7 @@ def generate_knot_methods(start_state, composition_color):
         start_state (list): 初始多股绳子的颜色排列顺序，例如 ['R', 'B', 'G', 'Y']。
         composition_color (list of list): 目标绳结颜色排列方式，例如
                                         [['R', 'G'], ['B', 'Y']]。
+        quiet (bool): 为 True 时不在控制台输出任何内容，只返回结果，供服务端等调用方使用。
 
     Returns:
         tuple: (list of list: 最简洁的打结方式 (compositon_method),
@@ -139,15 +140,18 @@ def generate_knot_methods(start_state, composition_color):
     # The initial state is added to current_states_path for the first call
     backtrack(0, list(start_state), [], [list(start_state)]) 
     
-    print("\n--- 绳结生成过程 ---")
+    if not quiet:
+        print("\n--- 绳结生成过程 ---")
 
     if not all_found_solutions:
-        print("未能找到符合条件的打结方式。")
-        print("---------------------\n")
+        if not quiet:
+            print("未能找到符合条件的打结方式。")
+            print("---------------------\n")
         return None, []
 
     # --- Step 1: Format and print all found solutions ---
-    print(f"找到 {len(all_found_solutions)} 种可能的编绳方法。\n")
+    if not quiet:
+        print(f"找到 {len(all_found_solutions)} 种可能的编绳方法。\n")
     
     # Convert internal knot type abbreviations to symbols for display
     for solution in all_found_solutions:
@@ -201,73 +205,75 @@ def generate_knot_methods(start_state, composition_color):
         # You could add tie-breaking rules here if needed, e.g., if scores are equal,
         # choose the one with fewer total knot changes, or a specific visual pattern preference.
 
-    print("\n--- 最简洁的编绳方法 ---")
-    if best_solution:
-        print(f"总简洁度分数: {min_score}")
-        print(f"最简洁的打结方式:\n {best_solution['method']}")
-        print(f"该方法对应的完整状态路径:")
-        print(f"初始状态: {best_solution['states_path'][0]}")
-        for i in range(len(best_solution['method'])):
-            print(f"第 {i+1} 行打结方式: {best_solution['method'][i]}")
-            print(f"更新后状态: {best_solution['states_path'][i+1]}")
-        print(f"结束状态 (end_state): {best_solution['end_state']}")
-        print(f"与初始状态一致: {best_solution['end_state'] == start_state}")
-    else:
-        print("未能找到最简洁的方法（此情况不应发生，如果 all_found_solutions 不为空）。")
-    print("---------------------\n")
+    if not quiet:
+        print("\n--- 最简洁的编绳方法 ---")
+        if best_solution:
+            print(f"总简洁度分数: {min_score}")
+            print(f"最简洁的打结方式:\n {best_solution['method']}")
+            print(f"该方法对应的完整状态路径:")
+            print(f"初始状态: {best_solution['states_path'][0]}")
+            for i in range(len(best_solution['method'])):
+                print(f"第 {i+1} 行打结方式: {best_solution['method'][i]}")
+                print(f"更新后状态: {best_solution['states_path'][i+1]}")
+            print(f"结束状态 (end_state): {best_solution['end_state']}")
+            print(f"与初始状态一致: {best_solution['end_state'] == start_state}")
+        else:
+            print("未能找到最简洁的方法（此情况不应发生，如果 all_found_solutions 不为空）。")
+        print("---------------------\n")
 
     return best_solution['method'] if best_solution else None, all_found_solutions
 
-# 示例 1: 简单的例子
-start_state_1 = ['R', 'B', 'G', 'Y']
-composition_color_1 = [['R', 'G'], ['B']] # This might have multiple ways to achieve it
-
-most_concise_method_1, all_methods_1 = generate_knot_methods(start_state_1, composition_color_1)
-
-
-print("-" * 30)
-
-# 示例 2：复杂例子
-# 在复杂例子中虽然生成的不是最优解（最方便记忆的传统解），但是是正确的
-# 生成最优解的代码等待进一步更新
-start_state_2 = ['R','R','W','W','R','R'] 
-composition_color_2 = [
-    ['R', 'W', 'R'], 
-    ['R','R'],     
-    ['R', 'W', 'R'],
-    ['W','W'],
-    ['R', 'W', 'R'],
-    ['R','R']
-]
-most_concise_method_2, all_methods_2 = generate_knot_methods(start_state_2, composition_color_2)
-
-
-# # 示例2 结果：
-# --- 绳结生成过程 ---
-# 找到 331776 种可能的编绳方法。
-# --- 最简洁的编绳方法 ---
-# 总简洁度分数: 9
-# 最简洁的打结方式:
-#  [['右右', '右右', '右右'], ['右左', '左右'], ['右右', '右右', '右右'], ['左右', '右左'], ['右 右', '右右', '右右'], ['右左', '左右']]
-# 该方法对应的完整状态路径:
-# 初始状态: ['R', 'R', 'W', 'W', 'R', 'R']
-# 第 1 行打结方式: ['右右', '右右', '右右']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
-# 第 2 行打结方式: ['右左', '左右']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
-# 第 3 行打结方式: ['右右', '右右', '右右']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
-# 第 4 行打结方式: ['左右', '右左']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
-# 第 5 行打结方式: ['右右', '右右', '右右']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
-# 第 6 行打结方式: ['右左', '左右']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
-# 结束状态 (end_state): ['R', 'R', 'W', 'W', 'R', 'R']
-# 与初始状态一致: True
-# ---------------------
-
-
-
-
-
+def main():
+    # 直接运行脚本时才执行示例，import 本模块不会触发任何计算
+    # 示例 1: 简单的例子
+    start_state_1 = ['R', 'B', 'G', 'Y']
+    composition_color_1 = [['R', 'G'], ['B']] # This might have multiple ways to achieve it
+
+    most_concise_method_1, all_methods_1 = generate_knot_methods(start_state_1, composition_color_1)
+
+
+    print("-" * 30)
+
+    # 示例 2：复杂例子
+    # 在复杂例子中虽然生成的不是最优解（最方便记忆的传统解），但是是正确的
+    # 生成最优解的代码等待进一步更新
+    start_state_2 = ['R','R','W','W','R','R'] 
+    composition_color_2 = [
+        ['R', 'W', 'R'], 
+        ['R','R'],     
+        ['R', 'W', 'R'],
+        ['W','W'],
+        ['R', 'W', 'R'],
+        ['R','R']
+    ]
+    most_concise_method_2, all_methods_2 = generate_knot_methods(start_state_2, composition_color_2)
+
+
+    # # 示例2 结果：
+    # --- 绳结生成过程 ---
+    # 找到 331776 种可能的编绳方法。
+    # --- 最简洁的编绳方法 ---
+    # 总简洁度分数: 9
+    # 最简洁的打结方式:
+    #  [['右右', '右右', '右右'], ['右左', '左右'], ['右右', '右右', '右右'], ['左右', '右左'], ['右 右', '右右', '右右'], ['右左', '左右']]
+    # 该方法对应的完整状态路径:
+    # 初始状态: ['R', 'R', 'W', 'W', 'R', 'R']
+    # 第 1 行打结方式: ['右右', '右右', '右右']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
+    # 第 2 行打结方式: ['右左', '左右']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
+    # 第 3 行打结方式: ['右右', '右右', '右右']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
+    # 第 4 行打结方式: ['左右', '右左']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
+    # 第 5 行打结方式: ['右右', '右右', '右右']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
+    # 第 6 行打结方式: ['右左', '左右']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'R']
+    # 结束状态 (end_state): ['R', 'R', 'W', 'W', 'R', 'R']
+    # 与初始状态一致: True
+    # ---------------------
+
+
+if __name__ == '__main__':
+    main()
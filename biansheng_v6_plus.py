@@ -1,7 +1,8 @@
 import math
-import itertools
 
-def generate_knot_methods(composition_color):
+from knot_solver.inference import color_count_lower_bounds, iter_start_state_candidates
+
+def generate_knot_methods(composition_color, quiet=False):
     """
     生成编绳结的方式，使得绳子颜色排列符合 composition_color。
     同时，确定一个初始绳子颜色排列顺序 start_state，使得最终绳子物理排列顺序与 start_state 相同。
@@ -12,6 +13,7 @@ def generate_knot_methods(composition_color):
     Args:
         composition_color (list of list): 目标绳结颜色排列方式，例如
                                          [['R', 'G'], ['B', 'Y']]。
+        quiet (bool): 为 True 时不在控制台输出任何内容，只返回结果，供服务端等调用方使用。
 
     Returns:
         tuple: (list: 最简洁方法的初始状态 (start_state),
@@ -93,7 +95,8 @@ def generate_knot_methods(composition_color):
         elif inferred_n_strings != current_n_strings:
             # If the number of strings implied by different lines is inconsistent,
             # it indicates an invalid composition_color structure.
-            print(f"Error: Inconsistent number of strings inferred from composition_color. Line {i} implies {current_n_strings} strings, but previous lines imply {inferred_n_strings}.")
+            if not quiet:
+                print(f"Error: Inconsistent number of strings inferred from composition_color. Line {i} implies {current_n_strings} strings, but previous lines imply {inferred_n_strings}.")
             return None, None, []
     
     n_strings = inferred_n_strings
@@ -193,26 +196,25 @@ def generate_knot_methods(composition_color):
     # Create a list of colors that is `n_strings` long, filled with unique_colors.
     # Then permute that list. This will handle cases like ['R', 'R', 'W', 'W'].
     
-    candidate_color_pool = []
-    if len(unique_colors) > 0:
-        # Distribute the unique colors as evenly as possible to form the initial pool
-        for i in range(n_strings):
-            candidate_color_pool.append(unique_colors[i % len(unique_colors)])
-    else:
+    if len(unique_colors) == 0:
         # No colors in composition_color, this is an invalid input
         return None, None, []
 
-    # Generate all unique permutations of the candidate_color_pool
-    start_state_candidates = list(set(itertools.permutations(candidate_color_pool, n_strings)))
-    start_state_candidates = [list(s) for s in start_state_candidates] # Convert tuples to lists
-    
-    # Sort for consistent processing, if desired (not strictly necessary for correctness)
-    start_state_candidates.sort() # Sorting helps in debugging and consistent output
+    # Pre-pass: derive necessary conditions from composition_color (every color in the
+    # pattern must be present, and a color shown k times in one row needs at least k strings).
+    # Only color-count vectors satisfying them are enumerated -- the round-robin pool
+    # (unique colors repeated to fill n_strings) first, then every other composition.
+    # Each distinct arrangement is generated lazily exactly once, and arrangements whose
+    # first or last row cannot be knotted are discarded before any search.
+    start_state_candidates = iter_start_state_candidates(composition_color, n_strings)
 
-    print(f"推断的绳子总数 (n_strings): {n_strings}")
-    print(f"生成的初始状态候选数量: {len(start_state_candidates)}\n")
+    if not quiet:
+        print(f"推断的绳子总数 (n_strings): {n_strings}")
+        print(f"每种颜色的最少根数: {color_count_lower_bounds(composition_color)}\n")
+    n_candidates_searched = 0
 
     for current_start_state_candidate in start_state_candidates:
+        n_candidates_searched += 1
         temp_all_found_solutions_for_candidate = [] # Stores solutions for this specific start_state_candidate
         
         def backtrack(current_line_idx, current_state, current_method_path, current_states_path):
@@ -316,15 +318,19 @@ def generate_knot_methods(composition_color):
         backtrack(0, list(current_start_state_candidate), [], [list(current_start_state_candidate)])
         all_potential_solutions.extend(temp_all_found_solutions_for_candidate)
 
-    print("\n--- 绳结生成过程 ---")
+    if not quiet:
+        print(f"搜索的初始状态候选数量: {n_candidates_searched}")
+        print("\n--- 绳结生成过程 ---")
 
     if not all_potential_solutions:
-        print("未能找到符合条件的打结方式。")
-        print("---------------------\n")
+        if not quiet:
+            print("未能找到符合条件的打结方式。")
+            print("---------------------\n")
         return None, None, []
 
     # --- Step 1: Format and print all found solutions ---
-    print(f"找到 {len(all_potential_solutions)} 种可能的编绳方法。\n")
+    if not quiet:
+        print(f"找到 {len(all_potential_solutions)} 种可能的编绳方法。\n")
     
     # Convert internal knot type abbreviations to symbols for display
     for solution in all_potential_solutions:
@@ -366,81 +372,89 @@ def generate_knot_methods(composition_color):
         # Tie-breaking: if scores are equal, prioritize methods with more "symmetric" knot types (e.g., all RR or all RL)
         # or fewer overall knot types. The current scoring already implicitly favors fewer unique types.
 
-    print("\n--- 最简洁的编绳方法 ---")
-    if best_solution:
-        print(f"总简洁度分数: {min_score}")
-        print(f"推断的初始状态 (start_state): {best_solution['start_state']}")
-        print(f"最简洁的打结方式:\n {best_solution['method']}")
-        print(f"该方法对应的完整状态路径:")
-        print(f"初始状态: {best_solution['states_path'][0]}")
-        for i in range(len(best_solution['method'])):
-            print(f"第 {i+1} 行打结方式: {best_solution['method'][i]}")
-            print(f"更新后状态: {best_solution['states_path'][i+1]}")
-        print(f"结束状态 (end_state): {best_solution['end_state']}")
-        print(f"与初始状态一致: {best_solution['end_state'] == best_solution['start_state']}")
-    else:
-        print("未能找到最简洁的方法（此情况不应发生，如果 all_potential_solutions 不为空）。")
-    print("---------------------\n")
+    if not quiet:
+        print("\n--- 最简洁的编绳方法 ---")
+        if best_solution:
+            print(f"总简洁度分数: {min_score}")
+            print(f"推断的初始状态 (start_state): {best_solution['start_state']}")
+            print(f"最简洁的打结方式:\n {best_solution['method']}")
+            print(f"该方法对应的完整状态路径:")
+            print(f"初始状态: {best_solution['states_path'][0]}")
+            for i in range(len(best_solution['method'])):
+                print(f"第 {i+1} 行打结方式: {best_solution['method'][i]}")
+                print(f"更新后状态: {best_solution['states_path'][i+1]}")
+            print(f"结束状态 (end_state): {best_solution['end_state']}")
+            print(f"与初始状态一致: {best_solution['end_state'] == best_solution['start_state']}")
+        else:
+            print("未能找到最简洁的方法（此情况不应发生，如果 all_potential_solutions 不为空）。")
+        print("---------------------\n")
 
     return best_solution['start_state'] if best_solution else None, \
            best_solution['method'] if best_solution else None, \
            all_potential_solutions
 
-# 示例 1: 简单的例子
-composition_color_1 = [['R', 'G'], ['B']]
-start_state_1_inferred, most_concise_method_1, all_methods_1 = generate_knot_methods(composition_color_1)
-print(f"示例 1 推断的初始状态: {start_state_1_inferred}")
-print(f"示例 1 最简洁的方法: {most_concise_method_1}")
-
-print("\n" + "=" * 50 + "\n")
-
-# 示例 2：复杂例子
-composition_color_2 = [
-    ['R', 'W', 'R'], 
-    ['R','R'],    
-    ['R', 'W', 'R'],
-    ['W','W'],
-    ['R', 'W', 'R'],
-    ['R','R']
-]
-start_state_2_inferred, most_concise_method_2, all_methods_2 = generate_knot_methods(composition_color_2)
-print(f"示例 2 推断的初始状态: {start_state_2_inferred}")
-print(f"示例 2 最简洁的方法: {most_concise_method_2}")
-
-###  示例2 输出：
-# 推断的绳子总数 (n_strings): 6
-# 生成的初始状态候选数量: 20
-# --- 绳结生成过程 ---
-# 找到 53160 种可能的编绳方法。
-# --- 最简洁的编绳方法 ---
-# 总简洁度分数: 8
-# 推断的初始状态 (start_state): ['R', 'R', 'W', 'W', 'R', 'W']
-# 最简洁的打结方式:
-#  [['右左', '右左', '右左'], ['右左', '左右'], ['右右', '右右', '右右'], ['左右', '左右'], ['左 左', '左左', '左左'], ['右左', '左右']]
-# 该方法对应的完整状态路径:
-# 初始状态: ['R', 'R', 'W', 'W', 'R', 'W']
-# 第 1 行打结方式: ['右左', '右左', '右左']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'W']
-# 第 2 行打结方式: ['右左', '左右']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'W']
-# 第 3 行打结方式: ['右右', '右右', '右右']
-# 更新后状态: ['R', 'R', 'W', 'W', 'W', 'R']
-# 第 4 行打结方式: ['左右', '左右']
-# 更新后状态: ['R', 'R', 'W', 'W', 'W', 'R']
-# 第 5 行打结方式: ['左左', '左左', '左左']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'W']
-# 第 6 行打结方式: ['右左', '左右']
-# 更新后状态: ['R', 'R', 'W', 'W', 'R', 'W']
-# 结束状态 (end_state): ['R', 'R', 'W', 'W', 'R', 'W']
-# 与初始状态一致: True
-# ---------------------
-# 示例 2 推断的初始状态: ['R', 'R', 'W', 'W', 'R', 'W']
-# 示例 2 最简洁的方法: [['右左', '右左', '右左'], ['右左', '左右'], ['右右', '右右', '右右'], [' 左右', '左右'], ['左左', '左左', '左左'], ['右左', '左右']]
-
-print("\n" + "=" * 50 + "\n")
-
-# 示例 3: 新增示例，测试不同数量的绳子和颜色
-composition_color_3 = [['R', 'B', 'R', 'B'], ['R', 'B', 'R']] 
-start_state_3_inferred, most_concise_method_3, all_methods_3 = generate_knot_methods(composition_color_3)
-print(f"示例 3 推断的初始状态: {start_state_3_inferred}")
-print(f"示例 3 最简洁的方法: {most_concise_method_3}")
\ No newline at end of file
+def main():
+    # 直接运行脚本时才执行示例，import 本模块不会触发任何计算
+    # 示例 1: 简单的例子
+    composition_color_1 = [['R', 'G'], ['B']]
+    start_state_1_inferred, most_concise_method_1, all_methods_1 = generate_knot_methods(composition_color_1)
+    print(f"示例 1 推断的初始状态: {start_state_1_inferred}")
+    print(f"示例 1 最简洁的方法: {most_concise_method_1}")
+
+    print("\n" + "=" * 50 + "\n")
+
+    # 示例 2：复杂例子
+    composition_color_2 = [
+        ['R', 'W', 'R'], 
+        ['R','R'],    
+        ['R', 'W', 'R'],
+        ['W','W'],
+        ['R', 'W', 'R'],
+        ['R','R']
+    ]
+    start_state_2_inferred, most_concise_method_2, all_methods_2 = generate_knot_methods(composition_color_2)
+    print(f"示例 2 推断的初始状态: {start_state_2_inferred}")
+    print(f"示例 2 最简洁的方法: {most_concise_method_2}")
+
+    ###  示例2 输出：
+    # 推断的绳子总数 (n_strings): 6
+    # 每种颜色的最少根数: {'R': 2, 'W': 2}
+    # 搜索的初始状态候选数量: 14
+    # --- 绳结生成过程 ---
+    # 找到 473064 种可能的编绳方法。
+    # --- 最简洁的编绳方法 ---
+    # 总简洁度分数: 8
+    # 推断的初始状态 (start_state): ['R', 'R', 'W', 'W', 'R', 'W']
+    # 最简洁的打结方式:
+    #  [['右左', '右左', '右左'], ['右左', '左右'], ['右右', '右右', '右右'], ['左右', '左右'], ['左 左', '左左', '左左'], ['右左', '左右']]
+    # 该方法对应的完整状态路径:
+    # 初始状态: ['R', 'R', 'W', 'W', 'R', 'W']
+    # 第 1 行打结方式: ['右左', '右左', '右左']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'W']
+    # 第 2 行打结方式: ['右左', '左右']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'W']
+    # 第 3 行打结方式: ['右右', '右右', '右右']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'W', 'R']
+    # 第 4 行打结方式: ['左右', '左右']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'W', 'R']
+    # 第 5 行打结方式: ['左左', '左左', '左左']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'W']
+    # 第 6 行打结方式: ['右左', '左右']
+    # 更新后状态: ['R', 'R', 'W', 'W', 'R', 'W']
+    # 结束状态 (end_state): ['R', 'R', 'W', 'W', 'R', 'W']
+    # 与初始状态一致: True
+    # ---------------------
+    # 示例 2 推断的初始状态: ['R', 'R', 'W', 'W', 'R', 'W']
+    # 示例 2 最简洁的方法: [['右左', '右左', '右左'], ['右左', '左右'], ['右右', '右右', '右右'], [' 左右', '左右'], ['左左', '左左', '左左'], ['右左', '左右']]
+
+    print("\n" + "=" * 50 + "\n")
+
+    # 示例 3: 新增示例，测试不同数量的绳子和颜色
+    composition_color_3 = [['R', 'B', 'R', 'B'], ['R', 'B', 'R']] 
+    start_state_3_inferred, most_concise_method_3, all_methods_3 = generate_knot_methods(composition_color_3)
+    print(f"示例 3 推断的初始状态: {start_state_3_inferred}")
+    print(f"示例 3 最简洁的方法: {most_concise_method_3}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+手绳编织打结方式求解器。
+
+biansheng_v*.py 脚本是独立的演示程序；这里提供可以被服务端等其他代码直接导入的求解引擎。
+strategies.solve 用统一的接口提供三个脚本的策略，python -m knot_solver demo 运行它们的示例。
+
+子模块在第一次用到其中的名字时才导入，import knot_solver 本身不做任何计算，
+也不会加载多进程等用不到的模块。
+"""
+
+import importlib
+
+# 对外的名字 -> 定义它的子模块
+_EXPORTS = {
+    'Palette': 'encoding',
+    'CancellationToken': 'cancellation',
+    'SearchCancelled': 'cancellation',
+    'SearchStats': 'stats',
+    'KNOT_RULES': 'engine',
+    'KNOT_MAPPING_SYMBOLS': 'engine',
+    'KNOT_TYPES': 'engine',
+    'CompiledPattern': 'engine',
+    'apply_knot': 'engine',
+    'row_conciseness_score': 'engine',
+    'count_solutions': 'engine',
+    'iter_solutions': 'engine',
+    'top_k_solutions': 'engine',
+    'branch_and_bound': 'engine',
+    'solve_optimal': 'engine',
+    'multiset_permutations': 'inference',
+    'count_multiset_permutations': 'inference',
+    'solve_with_inferred_start': 'inference',
+    'canonicalize': 'symmetry',
+    'canonical_key': 'symmetry',
+    'restore_solution': 'symmetry',
+    'solve_optimal_canonical': 'symmetry',
+    'solve_with_inferred_start_parallel': 'parallel',
+    'solve_optimal_parallel': 'parallel',
+    'estimate_search_cost': 'cost',
+    'STRATEGIES': 'strategies',
+    'solve': 'strategies',
+    'solve_first': 'strategies',
+    'generate_pattern': 'benchmark',
+    'generate_corpus': 'benchmark',
+    'run_benchmark': 'benchmark',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
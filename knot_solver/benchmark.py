@@ -0,0 +1,334 @@
+"""
+性能基准：用随机生成的图案语料库测量三种求解策略的耗时和峰值内存，结果写成 JSON，便于比较不同版本。
+
+    python -m knot_solver bench [--strings 4,6] [--rows 2,4,6] [--palette 2,3] [--per-config 3]
+                                [--strategies first,optimal,infer] [--repeat 3] [--timeout 30]
+                                [--seed 0] [-o results.json] [--compare baseline.json]
+
+图案由随机的打结方式模拟得到，因此一定至少有一种方案（生成时使用的那一种）。
+耗时取 repeat 次运行的最小值和中位数；峰值内存在另外一次运行中用 tracemalloc 测量，
+tracemalloc 会明显拖慢运行，不计入耗时。这次运行同样受 --timeout 限制，超时时不记录峰值内存。
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import platform
+import statistics
+import subprocess
+import tracemalloc
+
+from .engine import KNOT_TYPES, KNOT_MAPPING_SYMBOLS, apply_knot, line_layout
+from .cancellation import CancellationToken, SearchCancelled
+from .strategies import STRATEGIES, solve
+
+# 生成图案使用的颜色，按顺序取前 palette_size 个
+COLORS = ('R', 'W', 'B', 'G', 'Y', 'K', 'O', 'P')
+
+# 三种策略对应的 biansheng 脚本
+STRATEGY_SCRIPTS = {
+    'first': 'biansheng_v4_success',
+    'optimal': 'biansheng_v5_perfect',
+    'infer': 'biansheng_v6_plus',
+}
+
+# 结果文件格式的版本，字段有不兼容的变化时加 1
+RESULT_FORMAT_VERSION = 1
+
+
+def generate_pattern(n_strings, n_rows, palette_size, rng):
+    """
+    模拟随机的打结方式生成一个图案。
+
+    先只跟踪每根绳子的位置，得到 n_rows 行之后绳子的排列；再给这个排列的每个循环分配一种颜色，
+    这样结束状态的颜色排列必然与初始状态相同。不同颜色的数量不超过循环的数量，可能少于 palette_size。
+
+    Args:
+        n_strings (int): 绳子数量，必须是偶数。
+        n_rows (int): 行数。
+        palette_size (int): 最多使用的颜色数量，不超过 len(COLORS)。
+        rng (random.Random): 随机数生成器。
+
+    Returns:
+        dict: {'start_state', 'composition_color', 'method': 生成时使用的打结方式（'右右' 等符号）}
+    """
+    if n_strings % 2 != 0:
+        raise ValueError("n_strings 必须是偶数。")
+    if not 1 <= palette_size <= len(COLORS):
+        raise ValueError(f"palette_size 必须在 1 到 {len(COLORS)} 之间。")
+
+    # positions[i] 为当前第 i 个位置上的绳子编号；knot_strings 记录每个绳结显示的是哪根绳子
+    positions = list(range(n_strings))
+    knot_strings = []
+    method = []
+    for line_idx in range(n_rows):
+        num_knots_in_line, start_idx = line_layout(n_strings, line_idx)
+        line_strings = []
+        line_method = []
+        for knot_idx in range(num_knots_in_line):
+            left = start_idx + 2 * knot_idx
+            knot_type = KNOT_TYPES[rng.randrange(len(KNOT_TYPES))]
+            shown, positions[left:left + 2] = apply_knot(knot_type, tuple(positions[left:left + 2]))
+            line_strings.append(shown)
+            line_method.append(KNOT_MAPPING_SYMBOLS[knot_type])
+        knot_strings.append(line_strings)
+        method.append(line_method)
+
+    # 结束时第 i 个位置上是绳子 positions[i]，它必须与初始时第 i 根绳子同色：同一循环内的绳子同色
+    cycles = []
+    seen = set()
+    for string in range(n_strings):
+        if string in seen:
+            continue
+        cycle = []
+        while string not in seen:
+            seen.add(string)
+            cycle.append(string)
+            string = positions[string]
+        cycles.append(cycle)
+
+    # 尽量用满 palette_size 种颜色：先给随机选出的循环各分配一种不同的颜色，其余循环随机取色
+    colors = list(COLORS[:palette_size])
+    rng.shuffle(cycles)
+    string_colors = [None] * n_strings
+    for cycle_idx, cycle in enumerate(cycles):
+        color = colors[cycle_idx] if cycle_idx < len(colors) else rng.choice(colors)
+        for string in cycle:
+            string_colors[string] = color
+
+    return {
+        'start_state': string_colors,
+        'composition_color': [[string_colors[string] for string in line] for line in knot_strings],
+        'method': method,
+    }
+
+
+def generate_corpus(string_counts, row_counts, palette_sizes, per_config=3, seed=0):
+    """
+    为每种 (绳子数, 行数, 颜色数) 组合生成 per_config 个图案。同样的参数和 seed 总是生成同样的语料库。
+
+    Returns:
+        list of dict: generate_pattern 的结果，另附 'id'、'n_strings'、'n_rows'、'palette_size'（实际用到的颜色数）。
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for n_strings in string_counts:
+        for n_rows in row_counts:
+            for palette_size in palette_sizes:
+                for sample_idx in range(per_config):
+                    pattern = generate_pattern(n_strings, n_rows, palette_size, rng)
+                    pattern.update({
+                        'id': f's{n_strings}-r{n_rows}-p{palette_size}-{sample_idx}',
+                        'n_strings': n_strings,
+                        'n_rows': n_rows,
+                        'palette_size': len(set(pattern['start_state'])),
+                    })
+                    corpus.append(pattern)
+    return corpus
+
+
+def _run_once(pattern, strategy, timeout):
+    """运行一次求解，返回 (结果 dict 或 None（超时）, 耗时秒数)。"""
+    start_state = None if strategy == 'infer' else pattern['start_state']
+    cancel_token = CancellationToken(deadline=timeout) if timeout else None
+    started = time.perf_counter()
+    try:
+        result = solve(pattern['composition_color'], start_state=start_state, strategy=strategy,
+                       with_count=strategy != 'first', cancel_token=cancel_token)
+    except SearchCancelled:
+        result = None
+    return result, time.perf_counter() - started
+
+
+def benchmark_pattern(pattern, strategy, repeat=3, timeout=None, measure_memory=True):
+    """
+    测量一个图案在一种策略下的耗时和峰值内存。
+
+    Returns:
+        dict: {'pattern', 'strategy', 'script', 'status': 'ok'/'no_solution'/'timeout',
+               'seconds_min', 'seconds_median', 'runs', 'peak_memory_bytes', 'score', 'total_solutions'}
+    """
+    record = {
+        'pattern': pattern['id'],
+        'strategy': strategy,
+        'script': STRATEGY_SCRIPTS[strategy],
+        'n_strings': pattern['n_strings'],
+        'n_rows': pattern['n_rows'],
+        'palette_size': pattern['palette_size'],
+    }
+
+    timings = []
+    result = None
+    for _ in range(repeat):
+        result, seconds = _run_once(pattern, strategy, timeout)
+        timings.append(seconds)
+        if result is None:
+            break
+
+    # 计时已经超时的图案不再测量内存；测量内存的运行同样受 timeout 限制，超时时 peak_memory 为 None
+    peak_memory = None
+    if result is not None and measure_memory:
+        tracemalloc.start()
+        try:
+            memory_result, _ = _run_once(pattern, strategy, timeout)
+            if memory_result is not None:
+                peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    if result is None:
+        status = 'timeout'
+    elif result['solution'] is None:
+        status = 'no_solution'
+    else:
+        status = 'ok'
+    record.update({
+        'status': status,
+        'seconds_min': min(timings),
+        'seconds_median': statistics.median(timings),
+        'runs': len(timings),
+        'peak_memory_bytes': peak_memory,
+        'score': result['solution']['score'] if status == 'ok' else None,
+        'total_solutions': result['total_solutions'] if result is not None else None,
+    })
+    return record
+
+
+def _git_revision():
+    """当前代码的 git 提交，不在 git 仓库中时返回 None。"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True).strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(corpus, strategies=STRATEGIES, repeat=3, timeout=None, measure_memory=True, progress=None):
+    """
+    在语料库上测量每种策略，返回可以直接写成 JSON 的结果。
+
+    Args:
+        corpus (list of dict): generate_corpus 的返回值。
+        strategies (sequence): 要测量的策略，STRATEGIES 的子集。
+        repeat (int): 每个图案每种策略运行的次数。
+        timeout (float): 可选，单次运行的最长秒数，超时的运行记为 'timeout'，不再重复。
+        progress (callable): 可选，每测完一项以该项的结果 dict 调用。
+
+    Returns:
+        dict: {'format_version', 'revision', 'python', 'platform', 'created_at', 'settings',
+               'corpus': 语料库, 'results': benchmark_pattern 结果的列表}
+    """
+    results = []
+    for pattern in corpus:
+        for strategy in strategies:
+            record = benchmark_pattern(pattern, strategy, repeat=repeat, timeout=timeout,
+                                       measure_memory=measure_memory)
+            results.append(record)
+            if progress:
+                progress(record)
+
+    return {
+        'format_version': RESULT_FORMAT_VERSION,
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'settings': {'strategies': list(strategies), 'repeat': repeat, 'timeout': timeout,
+                     'measure_memory': measure_memory},
+        'corpus': corpus,
+        'results': results,
+    }
+
+
+def compare_results(baseline, current):
+    """
+    按 (图案, 策略) 对比两次基准结果的最短耗时。图案按内容匹配，两次的语料库参数不同也可以对比共同的图案。
+
+    Returns:
+        list of dict: {'pattern', 'strategy', 'baseline_seconds', 'current_seconds', 'speedup'}，
+                      只包含两次都成功完成的项；speedup > 1 表示 current 更快。
+    """
+    def pattern_keys(results):
+        return {pattern['id']: json.dumps([pattern['start_state'], pattern['composition_color']])
+                for pattern in results['corpus']}
+
+    baseline_keys = pattern_keys(baseline)
+    current_keys = pattern_keys(current)
+    baseline_seconds = {(baseline_keys[record['pattern']], record['strategy']): record['seconds_min']
+                        for record in baseline['results'] if record['status'] != 'timeout'}
+    rows = []
+    for record in current['results']:
+        key = (current_keys[record['pattern']], record['strategy'])
+        if record['status'] == 'timeout' or key not in baseline_seconds:
+            continue
+        before, after = baseline_seconds[key], record['seconds_min']
+        rows.append({
+            'pattern': record['pattern'],
+            'strategy': record['strategy'],
+            'baseline_seconds': before,
+            'current_seconds': after,
+            'speedup': before / after if after > 0 else None,
+        })
+    return rows
+
+
+def _int_list(text):
+    return [int(value) for value in text.split(',') if value.strip()]
+
+
+def add_arguments(parser):
+    """python -m knot_solver bench 的命令行参数。"""
+    parser.add_argument('--strings', type=_int_list, default=[4, 6], help='绳子数量，逗号分隔')
+    parser.add_argument('--rows', type=_int_list, default=[2, 4, 6], help='行数，逗号分隔')
+    parser.add_argument('--palette', type=_int_list, default=[2, 3], help='颜色数量，逗号分隔')
+    parser.add_argument('--per-config', type=int, default=3, help='每种组合生成的图案数')
+    parser.add_argument('--strategies', default=','.join(STRATEGIES), help='要测量的策略，逗号分隔')
+    parser.add_argument('--repeat', type=int, default=3, help='每项运行的次数')
+    parser.add_argument('--timeout', type=float, default=30.0, help='单次运行的最长秒数，0 表示不限制')
+    parser.add_argument('--no-memory', action='store_true', help='不测量峰值内存')
+    parser.add_argument('--seed', type=int, default=0, help='生成语料库的随机种子')
+    parser.add_argument('-o', '--output', help='结果 JSON 文件，默认输出到标准输出')
+    parser.add_argument('--compare', help='与这个基准结果文件对比耗时')
+
+
+def run(args):
+    """执行 bench 命令，返回退出码。"""
+    strategies = [strategy for strategy in args.strategies.split(',') if strategy]
+    unknown = [strategy for strategy in strategies if strategy not in STRATEGIES]
+    if unknown:
+        print(f"错误: 未知的策略 {', '.join(unknown)}，可选: {', '.join(STRATEGIES)}", file=sys.stderr)
+        return 2
+
+    corpus = generate_corpus(args.strings, args.rows, args.palette, per_config=args.per_config, seed=args.seed)
+
+    def progress(record):
+        print(f"{record['pattern']:<16} {record['strategy']:<8} {record['status']:<12} "
+              f"{record['seconds_min'] * 1000:10.2f} ms", file=sys.stderr)
+
+    results = run_benchmark(corpus, strategies, repeat=args.repeat, timeout=args.timeout or None,
+                            measure_memory=not args.no_memory, progress=progress)
+
+    text = json.dumps(results, ensure_ascii=False, indent=1)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare_results(baseline, results)
+        for row in rows:
+            speedup = f"{row['speedup']:.2f}x" if row['speedup'] is not None else '-'
+            print(f"{row['pattern']:<16} {row['strategy']:<8} {row['baseline_seconds'] * 1000:10.2f} ms -> "
+                  f"{row['current_seconds'] * 1000:10.2f} ms  {speedup}", file=sys.stderr)
+        speedups = [row['speedup'] for row in rows if row['speedup']]
+        if speedups:
+            geometric_mean = math.exp(sum(math.log(speedup) for speedup in speedups) / len(speedups))
+            print(f"几何平均加速比: {geometric_mean:.2f}x", file=sys.stderr)
+    return 0
@@ -0,0 +1,67 @@
+"""
+协作式取消：搜索过程中定期调用 CancellationToken.check()，被取消或超过截止时间时抛出 SearchCancelled。
+"""
+
+import time
+
+# check() 每被调用这么多次才真正读一次时钟，搜索热路径上的开销只是一次计数
+_CHECK_EVERY = 256
+
+
+class SearchCancelled(Exception):
+    """搜索被取消。reason 为 'cancelled'（主动取消）或 'deadline'（超过截止时间）。"""
+
+    def __init__(self, reason='cancelled'):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancellationToken:
+    """
+    由调用方持有、传给求解函数的取消标志。
+
+    Args:
+        deadline (float): 可选，从现在起允许搜索的秒数。
+        poll (callable): 可选，返回 True 表示应当取消，例如检查客户端是否已断开；
+                         每隔 poll_interval 秒调用一次。
+        poll_interval (float): 调用 poll 的最短间隔（秒）。
+    """
+
+    def __init__(self, deadline=None, poll=None, poll_interval=0.02):
+        self.deadline = time.monotonic() + deadline if deadline is not None else None
+        self.poll = poll
+        self.poll_interval = poll_interval
+        self.reason = None
+        self._countdown = _CHECK_EVERY
+        self._next_poll = time.monotonic() + poll_interval
+
+    def cancel(self, reason='cancelled'):
+        if self.reason is None:
+            self.reason = reason
+
+    def is_cancelled(self):
+        """立即检查所有取消条件，不受 check() 的节流限制。"""
+        if self.reason is None:
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                self.cancel('deadline')
+            elif self.poll is not None and self.poll():
+                self.cancel()
+        return self.reason is not None
+
+    def check(self):
+        """在搜索循环中调用；已取消时抛出 SearchCancelled。"""
+        self._countdown -= 1
+        if self._countdown > 0 and self.reason is None:
+            return
+        self._countdown = _CHECK_EVERY
+
+        if self.reason is None:
+            now = time.monotonic()
+            if self.deadline is not None and now >= self.deadline:
+                self.cancel('deadline')
+            elif self.poll is not None and now >= self._next_poll:
+                self._next_poll = now + self.poll_interval
+                if self.poll():
+                    self.cancel()
+        if self.reason is not None:
+            raise SearchCancelled(self.reason)
@@ -0,0 +1,120 @@
+"""
+命令行入口：python -m knot_solver <命令>
+
+    demo [--strategy first|optimal|infer]    运行 biansheng 脚本中的示例
+    solve PATTERN [--start START] [--strategy S] [--workers N] [--json]
+                                             求解一个图案，PATTERN 和 START 为 JSON，例如
+                                             '[["R","W","R"],["R","R"]]' 和 '["R","R","W","W","R","R"]'
+    bench [选项]                             在随机生成的图案上测量三种策略的耗时和内存，见 benchmark.py
+"""
+
+import sys
+import json
+import argparse
+
+from .strategies import STRATEGIES, solve
+from . import benchmark
+
+# biansheng 脚本中的示例：(名称, 初始状态或 None, 目标图案)
+EXAMPLE_2_PATTERN = [
+    ['R', 'W', 'R'],
+    ['R', 'R'],
+    ['R', 'W', 'R'],
+    ['W', 'W'],
+    ['R', 'W', 'R'],
+    ['R', 'R'],
+]
+EXAMPLES = {
+    'first': [
+        ('示例 1', ['R', 'B', 'G', 'Y'], [['R', 'G'], ['B']]),
+        ('示例 2', ['R', 'R', 'W', 'W', 'R', 'R'], EXAMPLE_2_PATTERN),
+    ],
+    'optimal': [
+        ('示例 1', ['R', 'B', 'G', 'Y'], [['R', 'G'], ['B']]),
+        ('示例 2', ['R', 'R', 'W', 'W', 'R', 'R'], EXAMPLE_2_PATTERN),
+    ],
+    'infer': [
+        ('示例 1', None, [['R', 'G'], ['B']]),
+        ('示例 2', None, EXAMPLE_2_PATTERN),
+        ('示例 3', None, [['R', 'B', 'R', 'B'], ['R', 'B', 'R']]),
+    ],
+}
+
+
+def print_result(result):
+    """按 biansheng 脚本的格式输出求解结果。"""
+    solution = result['solution']
+    print("\n--- 绳结生成过程 ---")
+    if result['total_solutions'] is not None:
+        print(f"找到 {result['total_solutions']} 种可能的编绳方法。")
+    if solution is None:
+        print("未能找到符合条件的打结方式。")
+        print("---------------------\n")
+        return
+
+    print(f"总简洁度分数: {solution['score']}")
+    if result['strategy'] == 'infer':
+        print(f"推断的初始状态 (start_state): {result['start_state']}")
+    print(f"初始状态: {solution['states_path'][0]}")
+    for i in range(len(solution['method'])):
+        print(f"第 {i+1} 行打结方式: {solution['method'][i]}")
+        print(f"更新后状态: {solution['states_path'][i+1]}")
+    print(f"结束状态 (end_state): {solution['end_state']}")
+    print(f"与初始状态一致: {solution['end_state'] == result['start_state']}")
+    print("---------------------\n")
+
+
+def run_demo(strategy):
+    for name, start_state, composition_color in EXAMPLES[strategy]:
+        print(f"{name} ({strategy})")
+        print(f"初始状态: {start_state if start_state is not None else '（推断）'}")
+        print(f"目标图案: {composition_color}")
+        print_result(solve(composition_color, start_state=start_state, strategy=strategy))
+        print("-" * 30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m knot_solver', description='手绳编织打结方式求解器')
+    subparsers = parser.add_subparsers(dest='command')
+
+    demo_parser = subparsers.add_parser('demo', help='运行 biansheng 脚本中的示例')
+    demo_parser.add_argument('--strategy', choices=STRATEGIES, default=None,
+                             help='只运行这一种策略的示例，默认全部运行')
+
+    solve_parser = subparsers.add_parser('solve', help='求解一个图案')
+    solve_parser.add_argument('pattern', help='目标图案（JSON 二维数组）')
+    solve_parser.add_argument('--start', default=None, help="初始状态（JSON 数组），'infer' 策略不需要")
+    solve_parser.add_argument('--strategy', choices=STRATEGIES, default='optimal')
+    solve_parser.add_argument('--workers', type=int, default=None,
+                              help="'optimal' 和 'infer' 策略并行求解的进程数，默认串行")
+    solve_parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+
+    bench_parser = subparsers.add_parser('bench', help='在随机生成的图案上测量各策略的耗时和内存')
+    benchmark.add_arguments(bench_parser)
+
+    args = parser.parse_args(argv)
+    if args.command == 'demo':
+        for strategy in ([args.strategy] if args.strategy else STRATEGIES):
+            run_demo(strategy)
+        return 0
+
+    if args.command == 'solve':
+        try:
+            composition_color = json.loads(args.pattern)
+            start_state = json.loads(args.start) if args.start is not None else None
+            result = solve(composition_color, start_state=start_state, strategy=args.strategy,
+                           workers=args.workers)
+        except ValueError as e:
+            print(f"错误: {e}", file=sys.stderr)
+            return 2
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False))
+        else:
+            print_result(result)
+        return 0 if result['solution'] is not None else 1
+
+    if args.command == 'bench':
+        return benchmark.run(args)
+
+    parser.print_help()
+    return 2
@@ -0,0 +1,92 @@
+"""
+在真正求解之前粗略估计一个问题的搜索代价。
+
+只用到问题的规模（绳子数、行数、颜色数）和一次浅层试探：逐行向下展开，但每行最多只
+保留 probe_width 个状态，用它们测得的分支数和去重比例外推整棵搜索树的大小。
+可达状态少于 probe_width 时试探本身就是精确的。
+"""
+
+import time
+
+from .engine import CompiledPattern
+from .inference import count_multiset_permutations
+
+# 本机上实测的吞吐量：动态规划（solve_optimal 加 count_solutions）每秒处理的状态转移数，
+# top_k_solutions 逐个枚举方案时每秒展开的节点数。用 benchmark.generate_pattern 随机生成、试探精确的图案测量，
+# 取各图案吞吐量的 10% 分位数，宁可高估耗时，也不让超过准入上限的请求直接计算
+DP_TRANSITIONS_PER_SECOND = 400000
+ENUMERATION_NODES_PER_SECOND = 300000
+
+
+def estimate_search_cost(start_state, composition_color, probe_width=64, with_top_k=False, time_budget=None):
+    """
+    估计求解 (start_state, composition_color) 所需的工作量和时间。
+
+    Args:
+        start_state (list): 初始多股绳子的颜色排列顺序。
+        composition_color (list of list): 目标绳结颜色排列方式。
+        probe_width (int): 试探时每行最多展开的状态数。
+        with_top_k (bool): 是否还要逐个枚举方案（topK 需要遍历全部方案）。
+        time_budget (float): 可选，分支定界搜索的秒数预算；方案计数和 topK 不受预算限制。
+
+    Returns:
+        dict: {'n_strings', 'n_lines', 'palette_size', 'state_space': 每行可能出现的状态数上限,
+               'dp_transitions': 最优解和计数各需处理的状态转移数估计,
+               'enumeration_nodes': 逐个枚举全部方案需要展开的节点数估计,
+               'estimated_seconds', 'exact': 试探是否覆盖了全部可达状态,
+               'probe_seconds': 本次估计本身花费的时间}
+    """
+    probe_started = time.perf_counter()
+    pattern = CompiledPattern(start_state, composition_color)
+    state_space = count_multiset_permutations(start_state)
+
+    dp_transitions = 0.0
+    enumeration_nodes = 0.0
+    exact = pattern.layout_ok
+    # frontier: 试探保留的状态及到达它的路径数（相对权重）
+    # reachable: 估计的可达状态数；paths: 估计的到达本行的路径数
+    frontier = {pattern.goal_state: 1} if pattern.layout_ok else {}
+    reachable = 1.0
+    paths = 1.0
+    for line_idx in range(pattern.n_lines):
+        if not frontier:
+            break
+        transitions = 0
+        weighted_transitions = 0
+        next_frontier = {}
+        for state, weight in frontier.items():
+            for _, next_state in pattern.row_transitions(line_idx, state):
+                transitions += 1
+                weighted_transitions += weight
+                next_frontier[next_state] = next_frontier.get(next_state, 0) + weight
+
+        dp_transitions += reachable * transitions / len(frontier)
+        paths *= weighted_transitions / sum(frontier.values())
+        enumeration_nodes += paths
+        # 试探到的不同后继状态与试探状态数之比，外推到所有可达状态，且不超过状态总数
+        reachable = min(state_space, reachable * len(next_frontier) / len(frontier))
+
+        if len(next_frontier) > probe_width:
+            exact = False
+            next_frontier = {state: next_frontier[state] for state in sorted(next_frontier)[:probe_width]}
+        frontier = next_frontier
+
+    # 求最优解和统计方案数各走一遍状态转移
+    search_seconds = dp_transitions / DP_TRANSITIONS_PER_SECOND
+    if time_budget is not None:
+        search_seconds = min(search_seconds, time_budget)
+    estimated_seconds = search_seconds + dp_transitions / DP_TRANSITIONS_PER_SECOND
+    if with_top_k:
+        estimated_seconds += enumeration_nodes / ENUMERATION_NODES_PER_SECOND
+
+    return {
+        'n_strings': pattern.n_strings,
+        'n_lines': pattern.n_lines,
+        'palette_size': len(pattern.palette),
+        'state_space': state_space,
+        'dp_transitions': int(dp_transitions),
+        'enumeration_nodes': int(enumeration_nodes),
+        'estimated_seconds': estimated_seconds,
+        'exact': exact,
+        'probe_seconds': time.perf_counter() - probe_started,
+    }
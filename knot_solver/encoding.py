@@ -0,0 +1,56 @@
+"""
+求解器内部使用的紧凑编码。
+
+颜色通过调色板映射成从 0 开始的小整数，一个状态（一排绳子的颜色）按每根绳子
+bits_per_color 位打包成一个 int，既能直接作为字典的键做记忆化，打结时也只需要位运算。
+'R'/'W' 这样的颜色列表只在求解器的入口和出口处转换。
+"""
+
+
+class Palette:
+    """颜色与整数编号之间的映射，以及状态的打包与解包。"""
+
+    def __init__(self, colors):
+        self.colors = list(colors)
+        self.color_ids = {color: color_id for color_id, color in enumerate(self.colors)}
+        if len(self.color_ids) != len(self.colors):
+            raise ValueError("调色板中的颜色不能重复。")
+        self.bits_per_color = max(1, (len(self.colors) - 1).bit_length())
+        self.color_mask = (1 << self.bits_per_color) - 1
+
+    @classmethod
+    def from_pattern(cls, *color_groups):
+        """
+        按首次出现的顺序收集颜色，例如 Palette.from_pattern(start_state, *composition_color)。
+        """
+        colors = []
+        seen = set()
+        for group in color_groups:
+            for color in group:
+                if color not in seen:
+                    seen.add(color)
+                    colors.append(color)
+        return cls(colors)
+
+    def __len__(self):
+        return len(self.colors)
+
+    def encode_colors(self, colors):
+        """把颜色序列转换成编号 tuple。"""
+        return tuple(self.color_ids[color] for color in colors)
+
+    def encode_state(self, state):
+        """把颜色列表打包成一个 int，第 i 根绳子占第 i 段 bits_per_color 位。"""
+        code = 0
+        for position, color in enumerate(state):
+            code |= self.color_ids[color] << (position * self.bits_per_color)
+        return code
+
+    def decode_state(self, code, n_strings):
+        """把打包的 int 还原成颜色列表。"""
+        return [self.colors[(code >> (position * self.bits_per_color)) & self.color_mask]
+                for position in range(n_strings)]
+
+    def color_at(self, code, position):
+        """读取打包状态中第 position 根绳子的颜色编号。"""
+        return (code >> (position * self.bits_per_color)) & self.color_mask
@@ -0,0 +1,512 @@
+## 向右打结一次：压在上面的绳子尾端水平向右
+## 向左打结一次：压在上面的绳子尾端水平向左
+
+import math
+import time
+import heapq
+import functools
+import itertools
+
+from .encoding import Palette
+
+KNOT_RULES = {
+    'RR': {'knot_color_idx': 0, 'new_order': [1, 0], 'type': 'swapping'},
+    'LL': {'knot_color_idx': 1, 'new_order': [1, 0], 'type': 'swapping'},
+    'RL': {'knot_color_idx': 0, 'new_order': [0, 1], 'type': 'non-swapping'},
+    'LR': {'knot_color_idx': 1, 'new_order': [0, 1], 'type': 'non-swapping'},
+}
+
+KNOT_MAPPING_SYMBOLS = {
+    'RR': '右右',
+    'LL': '左左',
+    'RL': '右左',
+    'LR': '左右',
+}
+
+SWAPPING_TYPES = {'RR', 'LL'}
+NON_SWAPPING_TYPES = {'RL', 'LR'}
+
+# 引擎内部用 KNOT_TYPES 中的下标表示打结方式，顺序即原始回溯尝试打结方式的顺序
+KNOT_TYPES = tuple(KNOT_RULES)
+_KNOT_COLOR_SIDE = tuple(KNOT_RULES[knot_type]['knot_color_idx'] for knot_type in KNOT_TYPES)
+_KNOT_SWAPS = tuple(KNOT_RULES[knot_type]['type'] == 'swapping' for knot_type in KNOT_TYPES)
+_KNOT_SYMBOLS_BY_ID = tuple(KNOT_MAPPING_SYMBOLS[knot_type] for knot_type in KNOT_TYPES)
+
+
+def row_conciseness_score(line_knots):
+    """
+    计算单行打结方式的简洁度分数（与 biansheng_v5_perfect 中
+    calculate_conciseness_score 的逐行计分完全一致）。
+
+    Args:
+        line_knots (sequence): 一行的打结方式缩写，例如 ('RR', 'RL')。
+
+    Returns:
+        int: 该行的分数 = 不同打结方式的数量 + 交换/不交换混用的惩罚分。
+    """
+    unique_types = set(line_knots)
+    score = len(unique_types)
+    if unique_types & SWAPPING_TYPES and unique_types & NON_SWAPPING_TYPES:
+        score += 1 # Penalty for mixing swapping and non-swapping operations
+    return score
+
+
+# 一行的分数只取决于用到了哪些打结方式，按“用到的打结方式”位掩码预先算好
+_ROW_SCORE_BY_MASK = tuple(
+    row_conciseness_score([knot_type for knot_id, knot_type in enumerate(KNOT_TYPES) if mask >> knot_id & 1])
+    for mask in range(1 << len(KNOT_TYPES))
+)
+
+
+def _row_score(line_knots):
+    """按打结方式编号计算单行分数。"""
+    mask = 0
+    for knot_id in line_knots:
+        mask |= 1 << knot_id
+    return _ROW_SCORE_BY_MASK[mask]
+
+
+def line_layout(n_strings, line_idx):
+    """
+    返回第 line_idx 行（从 0 开始）的 (绳结数量, 第一个绳结左侧绳子的下标)。
+    第 1、3、5... 行从第 0 根绳子开始打结；第 2、4、6... 行从第 1 根开始，首尾两根不打结。
+    """
+    if line_idx % 2 == 0:
+        return n_strings // 2, 0
+    return (n_strings // 2) - 1, 1
+
+
+def apply_knot(knot_type, pair):
+    """
+    用一种打结方式打一个绳结。
+
+    Args:
+        knot_type (str): 'RR'、'LL'、'RL' 或 'LR'。
+        pair (tuple): 打结前左右两根绳子（颜色、编号等任意值）。
+
+    Returns:
+        tuple: (绳结显示的那根绳子, 打结后左右两根绳子的 tuple)
+    """
+    rule = KNOT_RULES[knot_type]
+    return pair[rule['knot_color_idx']], tuple(pair[idx] for idx in rule['new_order'])
+
+
+class CompiledPattern:
+    """
+    一次求解所需的全部编码后数据：调色板、打包后的初始状态和每行的目标颜色编号。
+
+    所有求解器都在这个表示上运行，状态是 int，每行的打结方式是打结编号的 tuple；
+    只有 format_solution 会把结果转换回颜色列表和 '右右'/'左左' 符号。
+    给出 stats（SearchStats）时，枚举打结方式和格式化方案的过程会记入其中，
+    使用这个 pattern 的求解器也据此记录节点数等计数。
+    """
+
+    def __init__(self, start_state, composition_color, palette=None, stats=None):
+        self.n_strings = len(start_state)
+        if self.n_strings % 2 != 0:
+            raise ValueError("start_state 的长度必须是偶数。")
+        self.n_lines = len(composition_color)
+        self.palette = palette if palette is not None else Palette.from_pattern(start_state, *composition_color)
+        self.goal_state = self.palette.encode_state(start_state)
+        self.stats = stats
+
+        # 每行绳结数量与绳子数量不匹配时，与穷举法一样视为无解
+        self.layout_ok = True
+        self.lines = []
+        for line_idx, target_knot_colors in enumerate(composition_color):
+            num_knots_in_line, start_idx = line_layout(self.n_strings, line_idx)
+            if len(target_knot_colors) != num_knots_in_line:
+                self.layout_ok = False
+            self.lines.append((start_idx, self.palette.encode_colors(target_knot_colors)))
+
+    def row_transitions(self, line_idx, state):
+        """
+        枚举第 line_idx 行所有满足目标颜色的打结方式及打结后的状态。
+
+        枚举顺序与原始回溯中 find_knots_for_current_line 的深度优先顺序一致
+        （第一个绳结在最外层，打结方式按 RR, LL, RL, LR 顺序），
+        因此基于它的求解器在分数相同时会选出与穷举法相同的方案。
+
+        Yields:
+            tuple: (本行打结方式编号的 tuple, 打结后的状态 int)
+        """
+        start_idx, target_ids = self.lines[line_idx]
+        bits = self.palette.bits_per_color
+        color_mask = self.palette.color_mask
+
+        options_per_knot = []
+        for knot_idx, target_id in enumerate(target_ids):
+            shift = (start_idx + 2 * knot_idx) * bits
+            parent_string = ((state >> shift) & color_mask, (state >> (shift + bits)) & color_mask)
+            # 交换两根绳子 = 与两段颜色的异或值再做一次异或
+            diff = parent_string[0] ^ parent_string[1]
+            swap_delta = (diff << shift) | (diff << (shift + bits))
+            options = [(knot_id, swap_delta if _KNOT_SWAPS[knot_id] else 0)
+                       for knot_id in range(len(KNOT_TYPES))
+                       if parent_string[_KNOT_COLOR_SIDE[knot_id]] == target_id]
+            if self.stats is not None:
+                self.stats.knot_options(line_idx, knot_idx, len(options))
+            if not options:
+                return
+            options_per_knot.append(options)
+
+        for combination in itertools.product(*options_per_knot):
+            next_state = state
+            for _, swap_delta in combination:
+                next_state ^= swap_delta
+            yield tuple(knot_id for knot_id, _ in combination), next_state
+
+    def format_solution(self, score, method_path, states_path):
+        """把内部的打结方式编号和打包状态转换成对外的方案 dict。"""
+        if self.stats is not None:
+            with self.stats.timing('formatting'):
+                return self._format_solution(score, method_path, states_path)
+        return self._format_solution(score, method_path, states_path)
+
+    def _format_solution(self, score, method_path, states_path):
+        states = [self.palette.decode_state(state, self.n_strings) for state in states_path]
+        return {
+            'score': score,
+            'method': [[_KNOT_SYMBOLS_BY_ID[knot_id] for knot_id in line_knots]
+                       for line_knots in method_path],
+            'states_path': states,
+            'end_state': list(states[-1]),
+        }
+
+
+def solve_optimal(start_state, composition_color, cancel_token=None, stats=None):
+    """
+    用动态规划求最简洁的编绳方法，不枚举全部方案。
+
+    以 (行号, 当前状态) 为记忆化的键，计算从该状态出发、完成剩余各行并回到
+    start_state 所需的最小简洁度分数。由于分数按行累加，最优解只取决于
+    可达状态的数量，而不是完整路径的数量。分数相同时选取穷举法中最先找到的方案。
+
+    Args:
+        start_state (list): 初始多股绳子的颜色排列顺序，例如 ['R', 'B', 'G', 'Y']。
+        composition_color (list of list): 目标绳结颜色排列方式，例如
+                                        [['R', 'G'], ['B']]。
+        cancel_token (CancellationToken): 可选，被取消时抛出 SearchCancelled。
+        stats (SearchStats): 可选，记录节点数、分支数、结束状态检查和计分、格式化的耗时。
+
+    Returns:
+        dict: {'score', 'method', 'states_path', 'end_state'}，其中 method 使用
+              '右右'/'左左'/'右左'/'左右' 符号，格式与 biansheng_v5_perfect 的解一致。
+              如果找不到任何方法，则返回 None。
+    """
+    pattern = CompiledPattern(start_state, composition_color, stats=stats)
+    if not pattern.layout_ok:
+        return None
+
+    best = optimal_suffix(pattern, 0, pattern.goal_state, cancel_token)
+    if best is None:
+        return None
+    return pattern.format_solution(*best)
+
+
+def optimal_suffix(pattern, from_line_idx, from_state, cancel_token=None):
+    """
+    solve_optimal 的核心：从第 from_line_idx 行之前的状态 from_state 出发，求完成剩余各行
+    并回到初始状态的最优打结方式。也用于把搜索树拆成子树分给多个进程。
+
+    Returns:
+        tuple: (最小分数, 打结编号路径, 打包状态路径（包含 from_state）)；无解时返回 None。
+    """
+    n_lines = pattern.n_lines
+    goal_state = pattern.goal_state
+    stats = pattern.stats
+
+    # (line_idx, state) -> (最小剩余分数, 本行打结方式, 下一状态)
+    memo = {}
+
+    def best_from(line_idx, state):
+        if line_idx == n_lines:
+            if stats is not None:
+                stats.closing(state == goal_state)
+            return 0 if state == goal_state else math.inf
+
+        key = (line_idx, state)
+        if key in memo:
+            if stats is not None:
+                stats.pruned(line_idx)
+            return memo[key][0]
+        if cancel_token is not None:
+            cancel_token.check()
+        if stats is not None:
+            stats.expanded(line_idx)
+
+        best = (math.inf, None, None)
+        for line_knots, next_state in pattern.row_transitions(line_idx, state):
+            row_score = _row_score(line_knots) if stats is None else stats.score(_row_score, line_knots)
+            total = row_score + best_from(line_idx + 1, next_state)
+            if total < best[0]:
+                best = (total, line_knots, next_state)
+        memo[key] = best
+        return best[0]
+
+    min_score = best_from(from_line_idx, from_state)
+    if min_score == math.inf:
+        return None
+
+    method_path = []
+    states_path = [from_state]
+    state = from_state
+    for line_idx in range(from_line_idx, n_lines):
+        _, line_knots, state = memo[(line_idx, state)]
+        method_path.append(line_knots)
+        states_path.append(state)
+
+    return min_score, method_path, states_path
+
+
+def count_solutions(start_state, composition_color, cancel_token=None, stats=None):
+    """
+    统计所有可能的编绳方法数量，不生成也不保存任何一个方案。
+
+    逐行向前传播“到达每个状态的路径数”，最后读取回到 start_state 的路径数。
+    Python 整数没有上限，因此即使方案数大到无法放进内存也能得到精确值。
+
+    Args:
+        start_state (list): 初始多股绳子的颜色排列顺序。
+        composition_color (list of list): 目标绳结颜色排列方式。
+        cancel_token (CancellationToken): 可选，被取消时抛出 SearchCancelled。
+        stats (SearchStats): 可选，记录每行的状态数、分支数和在结束状态检查处被淘汰的路径数。
+
+    Returns:
+        int: 方案总数，与穷举法返回的 len(all_found_solutions) 相同。
+    """
+    pattern = CompiledPattern(start_state, composition_color, stats=stats)
+    if not pattern.layout_ok:
+        return 0
+    return count_suffix(pattern, 0, pattern.goal_state, cancel_token)
+
+
+def count_suffix(pattern, from_line_idx, from_state, cancel_token=None):
+    """count_solutions 的核心：从第 from_line_idx 行之前的状态 from_state 出发的方案数量。"""
+    stats = pattern.stats
+    path_counts = {from_state: 1}
+    for line_idx in range(from_line_idx, pattern.n_lines):
+        next_path_counts = {}
+        for state, count in path_counts.items():
+            if cancel_token is not None:
+                cancel_token.check()
+            if stats is not None:
+                stats.expanded(line_idx)
+            for _, next_state in pattern.row_transitions(line_idx, state):
+                next_path_counts[next_state] = next_path_counts.get(next_state, 0) + count
+        path_counts = next_path_counts
+        if not path_counts:
+            return 0
+
+    closed = path_counts.get(pattern.goal_state, 0)
+    if stats is not None:
+        stats.paths(sum(path_counts.values()), closed)
+    return closed
+
+
+def _iter_encoded_solutions(pattern, cancel_token=None):
+    """在编码后的表示上做深度优先搜索，产生 (分数, 打结编号路径, 打包状态路径)。"""
+    n_lines = pattern.n_lines
+    goal_state = pattern.goal_state
+    stats = pattern.stats
+
+    current_method_path = []
+    current_states_path = [goal_state]
+
+    def backtrack(current_line_idx, current_state, partial_score):
+        if current_line_idx == n_lines:
+            if stats is not None:
+                stats.closing(current_state == goal_state)
+            if current_state == goal_state:
+                yield partial_score, list(current_method_path), list(current_states_path)
+            return
+        if cancel_token is not None:
+            cancel_token.check()
+        if stats is not None:
+            stats.expanded(current_line_idx)
+
+        for line_knots, next_state in pattern.row_transitions(current_line_idx, current_state):
+            current_method_path.append(line_knots)
+            current_states_path.append(next_state)
+            row_score = _row_score(line_knots) if stats is None else stats.score(_row_score, line_knots)
+            yield from backtrack(current_line_idx + 1, next_state, partial_score + row_score)
+            current_method_path.pop()
+            current_states_path.pop()
+
+    yield from backtrack(0, goal_state, 0)
+
+
+def iter_solutions(start_state, composition_color, cancel_token=None, stats=None):
+    """
+    按穷举法的深度优先顺序逐个产生编绳方法，找到一个就立即交给调用者。
+
+    每行的简洁度分数在向下一行递归时就累加好，因此产生方案时分数已经算完；
+    内存里只保留当前这一条路径。
+
+    Args:
+        start_state (list): 初始多股绳子的颜色排列顺序。
+        composition_color (list of list): 目标绳结颜色排列方式。
+        cancel_token (CancellationToken): 可选，被取消时抛出 SearchCancelled。
+        stats (SearchStats): 可选，记录节点数、分支数、结束状态检查和计分、格式化的耗时。
+
+    Yields:
+        dict: 方案，格式与 solve_optimal 的返回值相同。
+    """
+    pattern = CompiledPattern(start_state, composition_color, stats=stats)
+    if not pattern.layout_ok:
+        return
+    for score, method_path, states_path in _iter_encoded_solutions(pattern, cancel_token):
+        yield pattern.format_solution(score, method_path, states_path)
+
+
+def top_k_solutions(start_state, composition_color, k, cancel_token=None, stats=None):
+    """
+    流式地求分数最低的 k 种编绳方法，内存占用只与 k 有关。
+
+    每找到一个方案就与堆中最差的方案比较，堆中始终只保留 k 个。
+    分数相同时先找到的方案排在前面，因此第一个结果与 solve_optimal 相同。
+
+    Args:
+        start_state (list): 初始多股绳子的颜色排列顺序。
+        composition_color (list of list): 目标绳结颜色排列方式。
+        k (int): 需要保留的方案数量，必须为正整数。
+        cancel_token (CancellationToken): 可选，被取消时抛出 SearchCancelled。
+        stats (SearchStats): 可选，记录节点数、分支数、结束状态检查和计分、格式化的耗时。
+
+    Returns:
+        list of dict: 按分数从低到高排列的方案，格式与 solve_optimal 的返回值相同。
+    """
+    if k < 1:
+        raise ValueError("k 必须是正整数。")
+
+    pattern = CompiledPattern(start_state, composition_color, stats=stats)
+    if not pattern.layout_ok:
+        return []
+
+    # 堆顶是目前保留的方案中最差的一个：分数最高、分数相同时找到得最晚
+    heap = []
+    for found_order, (score, method_path, states_path) in enumerate(_iter_encoded_solutions(pattern, cancel_token)):
+        entry = (-score, -found_order, method_path, states_path)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    heap.sort(key=lambda entry: entry[:2], reverse=True)
+    return [pattern.format_solution(-neg_score, method_path, states_path)
+            for neg_score, _, method_path, states_path in heap]
+
+
+class _SearchBudgetExhausted(Exception):
+    """时间或节点预算用完时，用来从递归搜索中一次性退出。"""
+
+
+def branch_and_bound(start_state, composition_color, time_budget=None, node_budget=None, cancel_token=None,
+                     stats=None):
+    """
+    带预算的分支定界搜索：随时可以停下并返回目前找到的最好方案。
+
+    回溯时逐行累加已确定部分的简洁度分数，再加上剩余各行分数的下界（每个有绳结的行至少 1 分），
+    如果已经不可能优于目前最好的方案就剪掉这个分支；同一 (行号, 状态) 如果之前以更低的分数到达过，
+    也直接剪掉。每行先尝试分数低的打结方式，以便尽早找到好的方案。
+    分数相同时按穷举法的深度优先顺序取舍，所以搜索完成时结果与 solve_optimal 相同。
+
+    Args:
+        start_state (list): 初始多股绳子的颜色排列顺序。
+        composition_color (list of list): 目标绳结颜色排列方式。
+        time_budget (float): 可选，允许搜索的秒数。
+        node_budget (int): 可选，允许展开的 (行号, 状态) 节点数。
+        cancel_token (CancellationToken): 可选，被取消时抛出 SearchCancelled；与预算用完不同，
+                                          取消时不返回目前的方案。
+        stats (SearchStats): 可选，记录节点数、剪枝数、分支数、结束状态检查和计分、格式化的耗时。
+
+    Returns:
+        tuple: (dict: 目前最好的方案，格式与 solve_optimal 相同，没有找到时为 None,
+                bool: 该结果是否已被证明最优；为 True 且方案为 None 表示确实无解)
+    """
+    pattern = CompiledPattern(start_state, composition_color, stats=stats)
+    if not pattern.layout_ok:
+        return None, True
+
+    n_lines = pattern.n_lines
+    goal_state = pattern.goal_state
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+
+    # remaining_lower_bound[i]: 第 i 行及之后各行分数之和的下界
+    remaining_lower_bound = [0] * (n_lines + 1)
+    for line_idx in range(n_lines - 1, -1, -1):
+        remaining_lower_bound[line_idx] = remaining_lower_bound[line_idx + 1] + \
+            (1 if pattern.lines[line_idx][1] else 0)
+
+    # 最好方案的 (分数, 深度优先顺序键, 打结方式, 状态路径)；顺序键是每行所选打结方式的枚举序号
+    best = [math.inf, None, None, None]
+    # (line_idx, state) -> 到达该节点时最好的 (已确定分数, 顺序键前缀)
+    best_arrival = {}
+    nodes_expanded = 0
+
+    current_method_path = []
+    current_states_path = [goal_state]
+    current_order_key = []
+
+    def backtrack(current_line_idx, current_state, partial_score):
+        nonlocal nodes_expanded
+
+        if current_line_idx == n_lines:
+            if stats is not None:
+                stats.closing(current_state == goal_state)
+            if current_state == goal_state:
+                candidate = (partial_score, tuple(current_order_key))
+                if best[0] == math.inf or candidate < (best[0], best[1]):
+                    best[:] = [partial_score, candidate[1],
+                               list(current_method_path), list(current_states_path)]
+            return
+
+        bound = partial_score + remaining_lower_bound[current_line_idx]
+        if bound > best[0] or \
+                bound == best[0] and tuple(current_order_key) > best[1][:current_line_idx]:
+            if stats is not None:
+                stats.pruned(current_line_idx)
+            return
+
+        arrival = (partial_score, tuple(current_order_key))
+        key = (current_line_idx, current_state)
+        if key in best_arrival and best_arrival[key] < arrival:
+            if stats is not None:
+                stats.pruned(current_line_idx)
+            return
+        best_arrival[key] = arrival
+
+        nodes_expanded += 1
+        if node_budget is not None and nodes_expanded > node_budget:
+            raise _SearchBudgetExhausted()
+        if deadline is not None and time.monotonic() > deadline:
+            raise _SearchBudgetExhausted()
+        if cancel_token is not None:
+            cancel_token.check()
+        if stats is not None:
+            stats.expanded(current_line_idx)
+
+        score_fn = _row_score if stats is None else functools.partial(stats.score, _row_score)
+        children = [(score_fn(line_knots), order, line_knots, next_state)
+                    for order, (line_knots, next_state) in enumerate(
+                        pattern.row_transitions(current_line_idx, current_state))]
+        children.sort(key=lambda child: child[:2])
+
+        for row_score, order, line_knots, next_state in children:
+            current_method_path.append(line_knots)
+            current_states_path.append(next_state)
+            current_order_key.append(order)
+            backtrack(current_line_idx + 1, next_state, partial_score + row_score)
+            current_method_path.pop()
+            current_states_path.pop()
+            current_order_key.pop()
+
+    try:
+        backtrack(0, goal_state, 0)
+        proven_optimal = True
+    except _SearchBudgetExhausted:
+        proven_optimal = False
+
+    if best[2] is None:
+        return None, proven_optimal
+    return pattern.format_solution(best[0], best[2], best[3]), proven_optimal
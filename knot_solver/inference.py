@@ -0,0 +1,232 @@
+"""
+不给出初始绳子颜色排列、只给出目标图案时（biansheng_v6_plus 的用法），推断初始状态并求解。
+"""
+
+import math
+
+from .engine import solve_optimal, count_solutions
+from .symmetry import canonical_key
+
+
+def multiset_permutations(items):
+    """
+    按字典序逐个产生 items 的所有不同排列，每个排列只产生一次。
+
+    与 set(itertools.permutations(items)) 不同，这里不会先生成全部 n! 个 tuple 再去重，
+    任何时候内存里只有当前这一个排列。例如 12 根绳子、两种颜色各 6 根时只产生 924 个候选，
+    而不是 4.79 亿个 tuple。
+
+    Args:
+        items (list): 可以包含重复元素的颜色列表，例如 ['R', 'R', 'W', 'W']。
+
+    Yields:
+        list: 一个排列。调用者可以自由修改，不会影响后续结果。
+    """
+    current = sorted(items)
+    n = len(current)
+    while True:
+        yield list(current)
+
+        # 找到最右边一个可以变大的位置，换上右侧比它大的最小元素，再把右侧变回升序
+        i = n - 2
+        while i >= 0 and current[i] >= current[i + 1]:
+            i -= 1
+        if i < 0:
+            return
+        j = n - 1
+        while current[j] <= current[i]:
+            j -= 1
+        current[i], current[j] = current[j], current[i]
+        current[i + 1:] = reversed(current[i + 1:])
+
+
+def count_multiset_permutations(items):
+    """不生成排列，直接计算 multiset_permutations(items) 会产生的排列数量。"""
+    color_counts = {}
+    for item in items:
+        color_counts[item] = color_counts.get(item, 0) + 1
+    total = math.factorial(len(items))
+    for count in color_counts.values():
+        total //= math.factorial(count)
+    return total
+
+
+def infer_n_strings(composition_color):
+    """
+    根据每行的绳结数量推断绳子总数：奇数行 k 个绳结对应 2k 根绳子，偶数行 k 个绳结对应 2(k+1) 根。
+
+    Returns:
+        int: 绳子总数；各行推断结果不一致时返回 None。
+    """
+    inferred_n_strings = 0
+    for i, line in enumerate(composition_color):
+        if i % 2 == 0: # Odd line (0, 2, ...)
+            current_n_strings = len(line) * 2
+        else: # Even line (1, 3, ...)
+            current_n_strings = (len(line) + 1) * 2
+
+        if inferred_n_strings == 0:
+            inferred_n_strings = current_n_strings
+        elif inferred_n_strings != current_n_strings:
+            return None
+    return inferred_n_strings
+
+
+def default_color_pool(composition_color, n_strings):
+    """与 biansheng_v6_plus 相同：把目标图案中出现的颜色按字母顺序轮流填满 n_strings 根绳子。"""
+    unique_colors = sorted({color for line in composition_color for color in line})
+    if not unique_colors:
+        return []
+    return [unique_colors[i % len(unique_colors)] for i in range(n_strings)]
+
+
+def solve_with_inferred_start(composition_color, cancel_token=None):
+    """
+    推断初始状态并求最简洁的编绳方法。
+
+    候选初始状态由 iter_start_state_candidates 逐个产生并立即求解，每个候选只保留最优方案和方案数量。
+    与 biansheng_v6_plus 只尝试一种颜色数量组合不同，这里会尝试所有满足必要条件的组合。
+    镜像或换色后与之前某个候选等价的候选不再重新搜索，直接沿用那个候选的方案数量；
+    它的最优分数也与之前的候选相同，不可能成为新的最优解。
+
+    Args:
+        composition_color (list of list): 目标绳结颜色排列方式。
+        cancel_token (CancellationToken): 可选，搜索中定期检查，被取消时抛出 SearchCancelled。
+
+    Returns:
+        tuple: (list: 最简洁方法的初始状态,
+                dict: 最简洁的方案，格式与 solve_optimal 的返回值相同,
+                int: 所有候选初始状态下的方案总数)
+               如果找不到任何方法，则返回 (None, None, 0)。
+    """
+    if not composition_color:
+        return None, None, 0
+
+    n_strings = infer_n_strings(composition_color)
+    if not n_strings or n_strings % 2 != 0:
+        return None, None, 0
+
+    best_start_state = None
+    best_solution = None
+    total_solutions = 0
+    # 规范形式 -> 该等价类中每个候选的方案数量
+    solved_classes = {}
+    for start_state_candidate in iter_start_state_candidates(composition_color, n_strings):
+        candidate_key = canonical_key(start_state_candidate, composition_color)
+        if candidate_key in solved_classes:
+            total_solutions += solved_classes[candidate_key]
+            continue
+
+        solution = solve_optimal(start_state_candidate, composition_color, cancel_token)
+        candidate_count = 0
+        if solution is not None:
+            candidate_count = count_solutions(start_state_candidate, composition_color, cancel_token)
+        solved_classes[candidate_key] = candidate_count
+        if solution is None:
+            continue
+        total_solutions += candidate_count
+        if best_solution is None or solution['score'] < best_solution['score']:
+            best_start_state = start_state_candidate
+            best_solution = solution
+
+    return best_start_state, best_solution, total_solutions
+
+
+def color_count_lower_bounds(composition_color):
+    """
+    从目标图案推导初始状态中每种颜色至少需要几根绳子。
+
+    同一行的绳结使用互不相交的两根绳子，每个绳结显示的是这两根中某一根的颜色，
+    所以某种颜色在一行里出现 k 次，就至少需要 k 根该颜色的绳子；图案中出现过的颜色至少 1 根。
+
+    Returns:
+        dict: {颜色: 最少根数}
+    """
+    lower_bounds = {}
+    for line in composition_color:
+        line_counts = {}
+        for color in line:
+            line_counts[color] = line_counts.get(color, 0) + 1
+        for color, count in line_counts.items():
+            lower_bounds[color] = max(lower_bounds.get(color, 0), count)
+    return lower_bounds
+
+
+def iter_color_count_vectors(lower_bounds, n_strings):
+    """
+    按颜色排序后的字典序，产生所有满足下界且总数为 n_strings 的颜色数量组合。
+
+    Yields:
+        dict: {颜色: 根数}
+    """
+    colors = sorted(lower_bounds)
+    if not colors:
+        return
+    spare = n_strings - sum(lower_bounds.values())
+    if spare < 0:
+        return
+
+    counts = {}
+
+    def assign(color_idx, remaining_spare):
+        color = colors[color_idx]
+        if color_idx == len(colors) - 1:
+            counts[color] = lower_bounds[color] + remaining_spare
+            yield dict(counts)
+            return
+        for extra in range(remaining_spare + 1):
+            counts[color] = lower_bounds[color] + extra
+            yield from assign(color_idx + 1, remaining_spare - extra)
+
+    yield from assign(0, spare)
+
+
+def start_state_is_feasible(start_state, composition_color):
+    """
+    不做搜索、只用必要条件判断一个候选初始状态是否可能有解。
+
+    打结只会交换同一对绳子，所以第一行每对绳子必须包含该绳结的颜色；
+    最后一行结束后要回到初始状态，最后一行每对绳子（按初始状态的位置）同样必须包含该绳结的颜色。
+    """
+    if not composition_color:
+        return True
+
+    n_strings = len(start_state)
+    for line_idx in sorted({0, len(composition_color) - 1}):
+        start_idx = 0 if line_idx % 2 == 0 else 1
+        for knot_idx, target_color in enumerate(composition_color[line_idx]):
+            parent_string_start_idx = start_idx + 2 * knot_idx
+            if parent_string_start_idx + 1 >= n_strings:
+                return False
+            if target_color not in (start_state[parent_string_start_idx],
+                                    start_state[parent_string_start_idx + 1]):
+                return False
+    return True
+
+
+def iter_start_state_candidates(composition_color, n_strings):
+    """
+    产生所有可能有解的候选初始状态。
+
+    先尝试与 biansheng_v6_plus 相同的轮流填色组合（分数相同时因此保持原来的结果），
+    再按字典序尝试其余满足颜色数量下界的组合；每个组合内的排列由 multiset_permutations 产生，
+    不满足 start_state_is_feasible 的排列在搜索之前就被丢弃。
+    """
+    lower_bounds = color_count_lower_bounds(composition_color)
+
+    default_pool = default_color_pool(composition_color, n_strings)
+    default_counts = {}
+    for color in default_pool:
+        default_counts[color] = default_counts.get(color, 0) + 1
+
+    count_vectors = []
+    if all(default_counts.get(color, 0) >= minimum for color, minimum in lower_bounds.items()):
+        count_vectors.append(default_counts)
+    count_vectors.extend(counts for counts in iter_color_count_vectors(lower_bounds, n_strings)
+                         if counts != default_counts)
+
+    for counts in count_vectors:
+        color_pool = [color for color in sorted(counts) for _ in range(counts[color])]
+        for start_state_candidate in multiset_permutations(color_pool):
+            if start_state_is_feasible(start_state_candidate, composition_color):
+                yield start_state_candidate
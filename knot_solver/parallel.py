@@ -0,0 +1,357 @@
+"""
+多进程并行求解。
+
+每个工作进程只返回自己负责部分的最优方案和方案数量；合并时按候选或子树的原始顺序决定
+分数相同的方案取哪一个，所以并行结果与串行结果完全一致。
+
+所有并行求解共用一个长期存在的进程池（按进程数各建一个，第一次使用时创建）。进程池以 spawn 方式
+启动，可以在多线程的服务进程中安全使用；每次求解不必再付出启动进程的开销。同时进行的求解各占一个
+槽位，槽位对应共享内存中的取消标志和目前最好的结果。
+"""
+
+import math
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .engine import CompiledPattern, solve_optimal, count_solutions, optimal_suffix, count_suffix, _row_score
+from .inference import infer_n_strings, iter_start_state_candidates
+from .symmetry import canonical_key
+from .cancellation import CancellationToken, SearchCancelled
+
+# 共享进程池最多同时服务的并行求解数，超出的调用等待空闲槽位
+MAX_CONCURRENT_SOLVES = 32
+
+# 工作进程中的共享内存，由 _init_worker 设置：每个槽位的取消标志，
+# 以及每个槽位的 (目前最好的分数, 取得该分数的候选序号)
+_cancel_flags = None
+_shared_best = None
+
+
+def _init_worker(cancel_flags, shared_best):
+    global _cancel_flags, _shared_best
+    _cancel_flags = cancel_flags
+    _shared_best = shared_best
+
+
+class _SolveSlots:
+    """在父进程中分配槽位；槽位在这次求解提交的所有任务都结束之后才归还，避免取消标志被下一次求解清掉。"""
+
+    def __init__(self, context, n_slots):
+        self.cancel_flags = context.Array('b', n_slots, lock=False)
+        self.shared_best = context.Array('d', [math.inf] * (2 * n_slots))
+        self._free = list(range(n_slots))
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while not self._free:
+                self._condition.wait()
+            slot = self._free.pop()
+        self.cancel_flags[slot] = 0
+        with self.shared_best.get_lock():
+            self.shared_best[2 * slot] = math.inf
+            self.shared_best[2 * slot + 1] = math.inf
+        return slot
+
+    def cancel(self, slot):
+        self.cancel_flags[slot] = 1
+
+    def release_after(self, slot, futures):
+        """futures 全部结束（完成、出错或被取消）后归还槽位。"""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def release(_=None):
+            with self._condition:
+                self._free.append(slot)
+                self._condition.notify()
+
+        def on_done(_):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                release()
+
+        if not futures:
+            release()
+        for future in futures:
+            future.add_done_callback(on_done)
+
+
+class _SharedPool:
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        context = multiprocessing.get_context('spawn')
+        self.slots = _SolveSlots(context, MAX_CONCURRENT_SOLVES)
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                            initializer=_init_worker,
+                                            initargs=(self.slots.cancel_flags, self.slots.shared_best))
+
+
+_shared_pools = {}
+_shared_pools_lock = threading.Lock()
+
+
+def _shared_pool(max_workers=None):
+    """max_workers 个进程的共享进程池，第一次使用时创建，之后一直复用。"""
+    max_workers = max_workers or multiprocessing.cpu_count()
+    with _shared_pools_lock:
+        pool = _shared_pools.get(max_workers)
+        if pool is None:
+            pool = _shared_pools[max_workers] = _SharedPool(max_workers)
+        return pool
+
+
+def _worker_cancel_token(slot):
+    """工作进程中检查这个槽位取消标志的 CancellationToken。"""
+    return CancellationToken(poll=lambda: _cancel_flags[slot] != 0)
+
+
+def _wait(pending, cancel_token, return_when):
+    """等待任务完成；cancel_token 被取消时抛出 SearchCancelled。"""
+    done, pending = wait(pending, timeout=0.02 if cancel_token is not None else None, return_when=return_when)
+    if cancel_token is not None and cancel_token.is_cancelled():
+        raise SearchCancelled(cancel_token.reason)
+    return done, pending
+
+
+def _publish_best(slot, score, candidate_idx):
+    """如果 (score, candidate_idx) 比这个槽位共享的最好结果更好，就更新它。"""
+    with _shared_best.get_lock():
+        if (score, candidate_idx) < (_shared_best[2 * slot], _shared_best[2 * slot + 1]):
+            _shared_best[2 * slot] = score
+            _shared_best[2 * slot + 1] = candidate_idx
+
+
+def _beaten(slot, lower_bound, candidate_idx):
+    """共享的最好结果是否已经不可能被这个候选超过（包括分数相同但序号更靠前）。"""
+    with _shared_best.get_lock():
+        return (_shared_best[2 * slot], _shared_best[2 * slot + 1]) < (lower_bound, candidate_idx)
+
+
+def _solve_start_state_candidate(slot, candidate_idx, start_state, composition_color, lower_bound, with_counts):
+    """
+    工作进程：求一个候选初始状态的最优方案和方案数量。
+
+    如果其他进程已经找到分数等于下界（即已被证明最优）且序号更靠前的方案，这个候选不可能再胜出：
+    开始前发现就跳过搜索，搜索途中发现（与取消标志一起定期检查）就立即停止。
+    被淘汰的候选不统计方案总数时不再做任何计算，统计时只计数（总数需要包括它的方案）。
+    搜索完成后无解的候选方案数量为 0，不再计数。
+
+    Returns:
+        tuple: (候选序号, 最优方案 dict 或 None, 方案数量或 None)
+    """
+    cancel_token = _worker_cancel_token(slot)
+    search_token = CancellationToken(
+        poll=lambda: _cancel_flags[slot] != 0 or _beaten(slot, lower_bound, candidate_idx))
+    solution = None
+    searched = not _beaten(slot, lower_bound, candidate_idx)
+    if searched:
+        try:
+            solution = solve_optimal(start_state, composition_color, search_token)
+        except SearchCancelled:
+            if _cancel_flags[slot] != 0:
+                raise
+            # 搜索途中被序号更靠前的最优方案淘汰
+            searched = False
+        if solution is not None:
+            _publish_best(slot, solution['score'], candidate_idx)
+
+    candidate_count = None
+    if with_counts:
+        if searched and solution is None:
+            candidate_count = 0
+        else:
+            candidate_count = count_solutions(start_state, composition_color, cancel_token)
+    return candidate_idx, solution, candidate_count
+
+
+def solve_with_inferred_start_parallel(composition_color, max_workers=None, with_counts=True, cancel_token=None):
+    """
+    并行版本的 solve_with_inferred_start：把候选初始状态分给共享进程池的多个进程。
+
+    镜像或换色等价的候选只提交一次，方案数量按等价候选的个数累加。所有进程共享目前最好的
+    分数，一旦某个方案的分数达到下界（每个有绳结的行至少 1 分），排在它后面的候选就不再搜索，
+    正在搜索的也会在几十毫秒内停止。
+
+    Args:
+        composition_color (list of list): 目标绳结颜色排列方式。
+        max_workers (int): 工作进程数，默认为 CPU 核数。
+        with_counts (bool): 是否统计方案总数；为 False 时被提前淘汰的候选不做任何计算。
+        cancel_token (CancellationToken): 可选，被取消时通知所有工作进程停止，并抛出 SearchCancelled。
+
+    Returns:
+        tuple: 与 solve_with_inferred_start 相同的 (初始状态, 最优方案, 方案总数)；
+               with_counts 为 False 时方案总数为 None。
+    """
+    if not composition_color:
+        return None, None, 0
+
+    n_strings = infer_n_strings(composition_color)
+    if not n_strings or n_strings % 2 != 0:
+        return None, None, 0
+
+    lower_bound = sum(1 for line in composition_color if line)
+    pool = _shared_pool(max_workers)
+    max_in_flight = pool.max_workers * 4
+
+    # 规范形式 -> [代表候选的序号, 等价候选的个数]
+    classes = {}
+    candidates = {}
+    results = {}
+
+    def collect(done):
+        for future in done:
+            candidate_idx, solution, candidate_count = future.result()
+            results[candidate_idx] = (solution, candidate_count)
+
+    slot = pool.slots.acquire()
+    futures = []
+    try:
+        pending = set()
+        for start_state_candidate in iter_start_state_candidates(composition_color, n_strings):
+            if cancel_token is not None:
+                cancel_token.check()
+            candidate_key = canonical_key(start_state_candidate, composition_color)
+            if candidate_key in classes:
+                classes[candidate_key][1] += 1
+                continue
+            candidate_idx = len(candidates)
+            classes[candidate_key] = [candidate_idx, 1]
+            candidates[candidate_idx] = start_state_candidate
+
+            if len(pending) >= max_in_flight:
+                done, pending = _wait(pending, cancel_token, return_when=FIRST_COMPLETED)
+                collect(done)
+            future = pool.executor.submit(_solve_start_state_candidate, slot, candidate_idx,
+                                          start_state_candidate, composition_color, lower_bound, with_counts)
+            futures.append(future)
+            pending.add(future)
+        while pending:
+            done, pending = _wait(pending, cancel_token, return_when=FIRST_COMPLETED)
+            collect(done)
+    except BaseException:
+        pool.slots.cancel(slot)
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        pool.slots.release_after(slot, futures)
+
+    best_idx = None
+    total_solutions = 0 if with_counts else None
+    for candidate_idx, multiplicity in classes.values():
+        solution, candidate_count = results[candidate_idx]
+        if with_counts:
+            total_solutions += candidate_count * multiplicity
+        if solution is None:
+            continue
+        if best_idx is None or (solution['score'], candidate_idx) < (results[best_idx][0]['score'], best_idx):
+            best_idx = candidate_idx
+
+    if best_idx is None:
+        return None, None, total_solutions
+    return candidates[best_idx], results[best_idx][0], total_solutions
+
+
+def _solve_subtree(slot, start_state, composition_color, from_line_idx, from_state, with_counts):
+    """
+    工作进程：求以 (from_line_idx, from_state) 为根的子树的最优后缀和方案数量。
+
+    Returns:
+        tuple: (from_state, optimal_suffix 的结果, 方案数量或 None)
+    """
+    pattern = CompiledPattern(start_state, composition_color)
+    cancel_token = _worker_cancel_token(slot)
+    best_suffix = optimal_suffix(pattern, from_line_idx, from_state, cancel_token)
+    subtree_count = count_suffix(pattern, from_line_idx, from_state, cancel_token) if with_counts else None
+    return from_state, best_suffix, subtree_count
+
+
+def solve_optimal_parallel(start_state, composition_color, max_workers=None, split_depth=1, with_counts=True,
+                           cancel_token=None):
+    """
+    给定初始状态时的并行求解：先展开前 split_depth 行，把每个子树交给共享进程池中的一个进程。
+
+    前几行打结后到达同一状态的子树只求解一次。合并时按前缀在深度优先顺序中的位置取舍，
+    分数相同时选出的方案与 solve_optimal 完全相同，方案总数与 count_solutions 相同。
+
+    Args:
+        start_state (list): 初始多股绳子的颜色排列顺序。
+        composition_color (list of list): 目标绳结颜色排列方式。
+        max_workers (int): 共享进程池的进程数，默认为 CPU 核数。
+        split_depth (int): 在主进程中展开的行数，通常为 1 或 2。
+        with_counts (bool): 是否统计方案总数。
+        cancel_token (CancellationToken): 可选，被取消时通知所有工作进程停止，并抛出 SearchCancelled。
+
+    Returns:
+        tuple: (dict: 最简洁的方案，格式与 solve_optimal 相同，无解时为 None,
+                int: 方案总数；with_counts 为 False 时为 None)
+    """
+    if split_depth < 1:
+        raise ValueError("split_depth 必须是正整数。")
+
+    pattern = CompiledPattern(start_state, composition_color)
+    if not pattern.layout_ok:
+        return None, 0 if with_counts else None
+
+    split_depth = min(split_depth, pattern.n_lines)
+
+    # 按深度优先顺序展开前 split_depth 行：(前缀分数, 打结编号路径, 打包状态路径)
+    prefixes = []
+
+    def expand(line_idx, state, prefix_score, method_path, states_path):
+        if line_idx == split_depth:
+            prefixes.append((prefix_score, method_path, states_path))
+            return
+        if cancel_token is not None:
+            cancel_token.check()
+        for line_knots, next_state in pattern.row_transitions(line_idx, state):
+            expand(line_idx + 1, next_state, prefix_score + _row_score(line_knots),
+                   method_path + [line_knots], states_path + [next_state])
+
+    expand(0, pattern.goal_state, 0, [], [pattern.goal_state])
+
+    subtree_roots = list(dict.fromkeys(states_path[-1] for _, _, states_path in prefixes))
+    subtree_results = {}
+    if subtree_roots:
+        pool = _shared_pool(max_workers)
+        slot = pool.slots.acquire()
+        futures = []
+        try:
+            futures = [pool.executor.submit(_solve_subtree, slot, start_state, composition_color,
+                                            split_depth, root_state, with_counts)
+                       for root_state in subtree_roots]
+            pending = set(futures)
+            while pending:
+                done, pending = _wait(pending, cancel_token, return_when=FIRST_COMPLETED)
+                for future in done:
+                    root_state, best_suffix, subtree_count = future.result()
+                    subtree_results[root_state] = (best_suffix, subtree_count)
+        except BaseException:
+            # 通知还在运行的子树停止，尚未开始的直接取消
+            pool.slots.cancel(slot)
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            pool.slots.release_after(slot, futures)
+
+    best = None
+    total_solutions = 0 if with_counts else None
+    for prefix_score, method_path, states_path in prefixes:
+        best_suffix, subtree_count = subtree_results[states_path[-1]]
+        if with_counts:
+            total_solutions += subtree_count
+        if best_suffix is None:
+            continue
+        suffix_score, suffix_method_path, suffix_states_path = best_suffix
+        total_score = prefix_score + suffix_score
+        if best is None or total_score < best[0]:
+            best = (total_score, method_path + suffix_method_path, states_path + suffix_states_path[1:])
+
+    if best is None:
+        return None, total_solutions
+    return pattern.format_solution(*best), total_solutions
@@ -0,0 +1,112 @@
+"""
+可选的搜索统计：传给求解函数的 SearchStats 记录每行展开的节点数、每个绳结的分支数、
+在结束状态检查处被淘汰的路径数，以及搜索、计分、格式化各自花费的时间。
+
+不传 stats 时求解函数只多做一次 None 判断；传入时计分的每次调用都要读两次时钟，搜索会变慢，
+只适合用来分析某个图案为什么慢。
+"""
+
+import time
+from contextlib import contextmanager
+
+PHASES = ('search', 'scoring', 'formatting')
+
+
+class SearchStats:
+    """
+    一次或几次求解的累计计数。同一个对象可以依次传给多个求解函数（例如先求最优解再计数），计数相加。
+
+    Attributes:
+        nodes_per_row (list): 第 i 行展开的 (行号, 状态) 节点数。
+        pruned_per_row (list): 第 i 行到达但没有展开的节点数：记忆化命中，或分支定界中被下界、
+                               更优的到达方式剪掉的节点。
+        dead_ends_per_row (list): 第 i 行枚举打结方式时，某个绳结没有任何打结方式能得到目标颜色的次数。
+        closing_checks (int): 走完所有行后检查结束状态是否等于初始状态的次数。
+        closing_rejections (int): 其中结束状态不等于初始状态的次数。
+        paths_at_close (int): 计数时走完所有行的完整路径数（未计数时为 None）。
+        paths_rejected_at_close (int): 其中因结束状态不等于初始状态而被淘汰的路径数。
+        seconds (dict): 'search'、'scoring'、'formatting' 各自花费的秒数，互不包含。
+    """
+
+    def __init__(self):
+        self.nodes_per_row = []
+        self.pruned_per_row = []
+        self.dead_ends_per_row = []
+        # 第 i 行第 j 个绳结：[被枚举的次数, 可选打结方式数之和]
+        self._knot_options = []
+        self.closing_checks = 0
+        self.closing_rejections = 0
+        self.paths_at_close = None
+        self.paths_rejected_at_close = None
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+
+    @staticmethod
+    def _bump(counts, line_idx, amount=1):
+        if line_idx >= len(counts):
+            counts.extend([0] * (line_idx + 1 - len(counts)))
+        counts[line_idx] += amount
+
+    def expanded(self, line_idx):
+        self._bump(self.nodes_per_row, line_idx)
+
+    def pruned(self, line_idx):
+        self._bump(self.pruned_per_row, line_idx)
+
+    def knot_options(self, line_idx, knot_idx, n_options):
+        """记录第 line_idx 行第 knot_idx 个绳结有 n_options 种打结方式可选。"""
+        while line_idx >= len(self._knot_options):
+            self._knot_options.append([])
+        row = self._knot_options[line_idx]
+        while knot_idx >= len(row):
+            row.append([0, 0])
+        row[knot_idx][0] += 1
+        row[knot_idx][1] += n_options
+        if n_options == 0:
+            self._bump(self.dead_ends_per_row, line_idx)
+
+    def closing(self, closed):
+        self.closing_checks += 1
+        if not closed:
+            self.closing_rejections += 1
+
+    def paths(self, at_close, closed):
+        """计数结束时记录走完所有行的路径数和其中回到初始状态的路径数。"""
+        self.paths_at_close = (self.paths_at_close or 0) + at_close
+        self.paths_rejected_at_close = (self.paths_rejected_at_close or 0) + at_close - closed
+
+    def score(self, score_fn, line_knots):
+        """调用计分函数并把耗时计入 'scoring'。"""
+        started = time.perf_counter()
+        score = score_fn(line_knots)
+        self.seconds['scoring'] += time.perf_counter() - started
+        return score
+
+    @contextmanager
+    def timing(self, phase):
+        """把代码块的耗时计入 phase，块内已经计入其他阶段的时间不重复计算。"""
+        started = time.perf_counter()
+        nested_before = sum(self.seconds.values())
+        try:
+            yield
+        finally:
+            nested = sum(self.seconds.values()) - nested_before
+            self.seconds[phase] += time.perf_counter() - started - nested
+
+    @property
+    def branching_per_knot(self):
+        """第 i 行第 j 个绳结平均有几种打结方式可选。"""
+        return [[round(total / evaluations, 3) if evaluations else None for evaluations, total in row]
+                for row in self._knot_options]
+
+    def as_dict(self):
+        return {
+            'nodes_per_row': list(self.nodes_per_row),
+            'pruned_per_row': list(self.pruned_per_row),
+            'dead_ends_per_row': list(self.dead_ends_per_row),
+            'branching_per_knot': self.branching_per_knot,
+            'closing_checks': self.closing_checks,
+            'closing_rejections': self.closing_rejections,
+            'paths_at_close': self.paths_at_close,
+            'paths_rejected_at_close': self.paths_rejected_at_close,
+            'seconds': {phase: round(seconds, 6) for phase, seconds in self.seconds.items()},
+        }
@@ -0,0 +1,85 @@
+"""
+三种求解策略的统一入口，分别对应三个 biansheng 脚本：
+
+- 'first'：按深度优先顺序找到的第一个方案（biansheng_v4_success）
+- 'optimal'：简洁度分数最低的方案（biansheng_v5_perfect）
+- 'infer'：只给出目标图案，推断初始状态并求最简洁的方案（biansheng_v6_plus）
+"""
+
+from .engine import iter_solutions, solve_optimal, count_solutions
+from .inference import solve_with_inferred_start
+
+STRATEGIES = ('first', 'optimal', 'infer')
+
+
+def solve_first(start_state, composition_color, cancel_token=None):
+    """
+    返回穷举法深度优先顺序中的第一个方案，与 biansheng_v4_success 找到的方案相同。
+
+    Returns:
+        dict: 方案，格式与 solve_optimal 的返回值相同；无解时返回 None。
+    """
+    return next(iter_solutions(start_state, composition_color, cancel_token), None)
+
+
+def solve(composition_color, start_state=None, strategy='optimal', with_count=True, cancel_token=None, workers=None):
+    """
+    用指定的策略求解。
+
+    Args:
+        composition_color (list of list): 目标绳结颜色排列方式。
+        start_state (list): 初始绳子颜色排列；'first' 和 'optimal' 必须给出，'infer' 不能给出。
+        strategy (str): STRATEGIES 中的一个。
+        with_count (bool): 是否同时统计方案总数。
+        cancel_token (CancellationToken): 可选，搜索中定期检查，被取消时抛出 SearchCancelled。
+        workers (int): 可选，大于 1 时 'optimal' 和 'infer' 在这么多个进程中并行求解，结果与串行相同；
+                       'first' 总是串行。
+
+    Returns:
+        dict: {'strategy', 'start_state': 使用的（或推断出的）初始状态,
+               'solution': 方案 dict 或 None, 'total_solutions': 方案总数，with_count 为 False 时为 None}
+
+    Raises:
+        ValueError: 策略未知，或 start_state 与策略不匹配。
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"未知的策略 {strategy!r}，可选: {', '.join(STRATEGIES)}")
+
+    if strategy == 'infer':
+        if start_state is not None:
+            raise ValueError("'infer' 策略会推断初始状态，不能同时给出 start_state。")
+        if workers is not None and workers > 1:
+            from .parallel import solve_with_inferred_start_parallel
+            start_state, solution, total_solutions = solve_with_inferred_start_parallel(
+                composition_color, max_workers=workers, with_counts=with_count, cancel_token=cancel_token)
+        else:
+            start_state, solution, total_solutions = solve_with_inferred_start(composition_color, cancel_token)
+        return {
+            'strategy': strategy,
+            'start_state': start_state,
+            'solution': solution,
+            'total_solutions': total_solutions if with_count else None,
+        }
+
+    if start_state is None:
+        raise ValueError(f"{strategy!r} 策略需要给出 start_state。")
+    if strategy == 'optimal' and workers is not None and workers > 1:
+        from .parallel import solve_optimal_parallel
+        solution, total_solutions = solve_optimal_parallel(start_state, composition_color, max_workers=workers,
+                                                           with_counts=with_count, cancel_token=cancel_token)
+        return {
+            'strategy': strategy,
+            'start_state': list(start_state),
+            'solution': solution,
+            'total_solutions': total_solutions,
+        }
+    if strategy == 'first':
+        solution = solve_first(start_state, composition_color, cancel_token)
+    else:
+        solution = solve_optimal(start_state, composition_color, cancel_token)
+    return {
+        'strategy': strategy,
+        'start_state': list(start_state),
+        'solution': solution,
+        'total_solutions': count_solutions(start_state, composition_color, cancel_token) if with_count else None,
+    }
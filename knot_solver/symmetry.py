@@ -0,0 +1,105 @@
+"""
+编绳问题的对称性：左右镜像与颜色重命名。
+
+- 把整个图案左右翻转，初始状态倒序、每行目标颜色倒序，打结方式中 右右↔左左、右左↔左右 互换，
+  简洁度分数不变。
+- 把颜色一致地换一个名字（例如 R→B、W→Y），打结方式完全不变。
+
+因此 (start_state, composition_color) 可以先化成规范形式再求解，同一等价类只需要求解一次，
+结果再映射回调用者的方向和颜色。注意镜像后分数相同的方案之间的取舍可能与直接求解不同，
+但得到的一定是同样分数的最优方案；颜色重命名不影响取舍（求解器按打结方式的枚举顺序取舍，与颜色无关），
+需要与直接求解得到完全相同的方案时用 canonicalize(..., mirror=False)。
+"""
+
+from .engine import solve_optimal
+
+MIRRORED_SYMBOLS = {
+    '右右': '左左',
+    '左左': '右右',
+    '右左': '左右',
+    '左右': '右左',
+}
+
+
+def _relabel(start_state, composition_color):
+    """按首次出现的顺序把颜色换成 0, 1, 2...，返回 (规范形式, 编号 -> 原颜色 的列表)。"""
+    color_ids = {}
+    colors = []
+
+    def label(color):
+        if color not in color_ids:
+            color_ids[color] = len(colors)
+            colors.append(color)
+        return color_ids[color]
+
+    relabeled_start = tuple(label(color) for color in start_state)
+    relabeled_composition = tuple(tuple(label(color) for color in line) for line in composition_color)
+    return (relabeled_start, relabeled_composition), colors
+
+
+def _mirror(start_state, composition_color):
+    """左右翻转整个问题。"""
+    return list(reversed(start_state)), [list(reversed(line)) for line in composition_color]
+
+
+def canonicalize(start_state, composition_color, mirror=True):
+    """
+    求问题在镜像和颜色重命名下的规范形式。
+
+    Args:
+        mirror (bool): 为 False 时只做颜色重命名、保持原来的方向，在规范形式上求得的方案与直接求解完全相同；
+                       镜像的两个问题得到不同的键。
+
+    Returns:
+        tuple: (tuple: 规范形式 (规范初始状态, 规范目标图案)，可以直接作为缓存的键,
+                dict: 变换信息 {'mirrored': 是否翻转过, 'colors': 规范编号对应的原颜色})
+    """
+    direct_key, direct_colors = _relabel(start_state, composition_color)
+    if not mirror:
+        return direct_key, {'mirrored': False, 'colors': direct_colors}
+    mirrored_key, mirrored_colors = _relabel(*_mirror(start_state, composition_color))
+    if mirrored_key < direct_key:
+        return mirrored_key, {'mirrored': True, 'colors': mirrored_colors}
+    return direct_key, {'mirrored': False, 'colors': direct_colors}
+
+
+def canonical_key(start_state, composition_color):
+    """只返回规范形式，镜像或换色之后的同一个问题得到相同的键。"""
+    return canonicalize(start_state, composition_color)[0]
+
+
+def restore_solution(solution, transform):
+    """
+    把在规范形式上求得的方案映射回原问题的方向和颜色。
+
+    Args:
+        solution (dict): 规范问题的方案，格式与 solve_optimal 的返回值相同；为 None 时原样返回。
+        transform (dict): canonicalize 返回的变换信息。
+    """
+    if solution is None:
+        return None
+
+    colors = transform['colors']
+    states_path = [[colors[color_id] for color_id in state] for state in solution['states_path']]
+    method = [list(line) for line in solution['method']]
+    if transform['mirrored']:
+        states_path = [list(reversed(state)) for state in states_path]
+        method = [[MIRRORED_SYMBOLS[symbol] for symbol in reversed(line)] for line in method]
+
+    restored = dict(solution)
+    restored['method'] = method
+    restored['states_path'] = states_path
+    restored['end_state'] = list(states_path[-1])
+    return restored
+
+
+def solve_optimal_canonical(start_state, composition_color, solver=solve_optimal):
+    """
+    在规范形式上调用 solver，再把结果映射回原问题。
+
+    Args:
+        solver (callable): 接受 (start_state, composition_color)、返回方案 dict 或 None 的求解函数。
+    """
+    (canonical_start, canonical_composition), transform = canonicalize(start_state, composition_color)
+    solution = solver(list(canonical_start), [list(line) for line in canonical_composition])
+    return restore_solution(solution, transform)
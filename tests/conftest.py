@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 测试直接导入 knot_solver 包和 v2/server 下的服务模块
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'v2', 'server'))
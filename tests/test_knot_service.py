@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+import knot_solver
+import knot_service
+
+
+def _tied_patterns(count, seed=0):
+    """镜像后求解与直接求解选出不同方案（分数相同）的图案。"""
+    rng = random.Random(seed)
+    patterns = []
+    while len(patterns) < count:
+        pattern = knot_solver.generate_pattern(6, 4, 3, rng)
+        start_state, composition_color = pattern['start_state'], pattern['composition_color']
+        direct = knot_solver.solve_optimal(start_state, composition_color)
+        mirrored = knot_solver.solve_optimal_canonical(start_state, composition_color)
+        if direct['method'] != mirrored['method']:
+            patterns.append((start_state, composition_color))
+    return patterns
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    knot_service.result_cache.clear()
+    yield
+    knot_service.result_cache.clear()
+
+
+@pytest.mark.parametrize('start_state, composition_color', _tied_patterns(10))
+def test_cached_and_direct_paths_pick_the_same_solution(start_state, composition_color):
+    expected = knot_solver.solve_optimal(start_state, composition_color)
+    body = {'startState': start_state, 'targetPattern': composition_color}
+    mirrored_body = {'startState': start_state[::-1], 'targetPattern': [line[::-1] for line in composition_color]}
+
+    responses = []
+    for request_body in (mirrored_body, body, body, dict(body, stats=True), dict(body, nodeBudget=10 ** 6)):
+        result, http_status = knot_service.solve_knot_request(knot_service.parse_knot_request(request_body))
+        assert http_status == 200
+        responses.append(result)
+    _, miss, hit, with_stats, with_budget = responses
+
+    assert with_budget['provenOptimal']
+    for result in (miss, hit, with_stats, with_budget):
+        assert result['bestSolution'] == expected['method']
+        assert result['statesPath'] == expected['states_path']
+
+
+@pytest.mark.parametrize('start_state, composition_color', _tied_patterns(3, seed=1))
+def test_cached_top_k_matches_direct_search(start_state, composition_color):
+    expected = knot_solver.top_k_solutions(start_state, composition_color, 5)
+    body = {'startState': start_state, 'targetPattern': composition_color, 'topK': 5}
+
+    for request_body in (body, body, dict(body, stats=True)):
+        result, http_status = knot_service.solve_knot_request(knot_service.parse_knot_request(request_body))
+        assert http_status == 200
+        assert [solution['method'] for solution in result['topSolutions']] == \
+            [solution['method'] for solution in expected]
+
+
+def test_estimate_skips_the_probe_on_a_cache_hit(monkeypatch):
+    params = knot_service.parse_knot_request({'startState': ['R', 'B', 'G', 'Y'],
+                                              'targetPattern': [['R', 'G'], ['B']]})
+    assert knot_service.estimate_request(params)['cached'] is False
+    knot_service.solve_knot_request(params)
+
+    def probe(*args, **kwargs):
+        raise AssertionError('命中缓存时不应试探')
+
+    monkeypatch.setattr(knot_solver, 'estimate_search_cost', probe)
+    estimate = knot_service.estimate_request(params)
+    assert estimate['cached'] is True
+    assert estimate['mode'] == 'inline'
+    assert estimate['estimatedSeconds'] == 0
+    assert (estimate['nStrings'], estimate['nLines'], estimate['paletteSize']) == (4, 2, 4)
@@ -0,0 +1,36 @@
+import math
+import random
+import threading
+import time
+import multiprocessing
+
+import knot_solver
+from knot_solver import parallel
+
+
+def test_running_candidate_stops_once_an_earlier_candidate_is_proven_optimal():
+    # 在本进程中直接调用工作进程的函数：槽位 0 的共享内存由测试自己创建
+    parallel._init_worker(multiprocessing.Array('b', 1, lock=False), multiprocessing.Array('d', [math.inf] * 2))
+    pattern = knot_solver.generate_pattern(16, 6, 3, random.Random(0))
+    start_state, composition_color = pattern['start_state'], pattern['composition_color']
+    lower_bound = sum(1 for line in composition_color if line)
+
+    # 搜索开始后，序号更靠前的候选发布了分数等于下界的方案
+    publisher = threading.Timer(0.2, parallel._publish_best, args=(0, lower_bound, 0))
+    publisher.start()
+    started = time.monotonic()
+    try:
+        result = parallel._solve_start_state_candidate(0, 1, start_state, composition_color, lower_bound, False)
+    finally:
+        publisher.cancel()
+    elapsed = time.monotonic() - started
+
+    # 完整搜索这个候选需要好几秒
+    assert elapsed < 1.5
+    assert result == (1, None, None)
+
+
+def test_inferred_parallel_matches_serial():
+    composition_color = [['R', 'G'], ['B']]
+    expected = knot_solver.solve_with_inferred_start(composition_color)
+    assert knot_solver.solve_with_inferred_start_parallel(composition_color, max_workers=2) == expected
@@ -261,18 +261,13 @@ Page({
         wx.hideLoading()
         
         if (res.statusCode === 200 && res.data && res.data.bestSolution) {
-          wx.navigateTo({
-            url: '/pages/result/result',
-            success: (navRes) => {
-              // 将API返回的结果和用户输入的原始目标图案一起传递给结果页
-              navRes.eventChannel.emit('acceptDataFromOpenerPage', { 
-                result: { 
-                  ...res.data, 
-                  targetPattern: compositionColor, // 明确传递用户输入的目标图案
-                } 
-              })
-            }
+          this.showResult(res.data, compositionColor)
+        } else if (res.statusCode === 202 && res.data && res.data.jobId) {
+          // 计算量较大，服务端转为后台任务，轮询任务状态
+          wx.showLoading({
+            title: '计算量较大...'
           })
+          this.pollJob(res.data.jobId, compositionColor)
         } else {
           wx.showToast({
             title: res.data.error || '生成方案失败',
@@ -292,6 +287,60 @@ Page({
     })
   },
 
+  // 跳转到结果页
+  showResult(result, compositionColor) {
+    wx.navigateTo({
+      url: '/pages/result/result',
+      success: (navRes) => {
+        // 将API返回的结果和用户输入的原始目标图案一起传递给结果页
+        navRes.eventChannel.emit('acceptDataFromOpenerPage', { 
+          result: { 
+            ...result, 
+            targetPattern: compositionColor, // 明确传递用户输入的目标图案
+          } 
+        })
+      }
+    })
+  },
+
+  // 轮询后台任务，完成后跳转到结果页
+  pollJob(jobId, compositionColor) {
+    const { apiBaseUrl } = this.data
+
+    wx.request({
+      url: `${apiBaseUrl}/jobs/${jobId}`,
+      method: 'GET',
+      success: (res) => {
+        const job = res.data || {}
+        if (res.statusCode === 200 && job.status === 'done' && job.result) {
+          wx.hideLoading()
+          this.showResult(job.result, compositionColor)
+        } else if (res.statusCode === 200 && (job.status === 'queued' || job.status === 'running')) {
+          const percent = Math.round((job.progress ? job.progress.fraction : 0) * 100)
+          wx.showLoading({
+            title: `计算中 ${percent}%`
+          })
+          setTimeout(() => this.pollJob(jobId, compositionColor), 1000)
+        } else {
+          wx.hideLoading()
+          wx.showToast({
+            title: job.error || '生成方案失败',
+            icon: 'none'
+          })
+        }
+      },
+      fail: (err) => {
+        wx.hideLoading()
+        console.error('查询任务失败:', err)
+
+        wx.showToast({
+          title: 'API调用失败, 请检查后端服务',
+          icon: 'none'
+        })
+      }
+    })
+  },
+
   // 获取颜色显示名称
   getColorName(colorValue) {
     const colorOption = this.data.colorOptions.find(option => option.value === colorValue)
@@ -1,228 +1,222 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context, g
 from flask_cors import CORS
-import sys
 import os
-import math
-
-# 添加Python算法文件路径
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+import json
+import time
+import select
+import socket
+import threading
+
+import knot_service
+from knot_service import (KnotRequestError, parse_knot_request, solve_knot_request, estimate_request,
+                          rejection_payload, result_cache, solution_store, in_flight_solves)
+from jobs import JobManager, JobQueueFullError
+from batch import MAX_BATCH_SIZE, iter_batch_results, shared_executor
+from knot_solver import CancellationToken
+from metrics import PhaseTimer, sample_family, request_latency, solver_phase_seconds, solution_count, observe_solve
 
 app = Flask(__name__)
 CORS(app)
 
-def generate_knot_methods(start_state, composition_color):
+# 每次求解的摘要记录等运行日志输出到 stderr
+knot_service.configure_logging()
+
+# 后台任务：工作进程数、完成结果的保留秒数、最多允许多少个未完成的任务、
+# 排队多少秒提升一级优先级、每个客户端最多同时运行的任务数
+job_manager = JobManager(
+    max_workers=int(os.environ.get('KNOT_JOB_WORKERS', '2')),
+    result_ttl=float(os.environ.get('KNOT_JOB_RESULT_TTL', '600')),
+    max_pending=int(os.environ.get('KNOT_JOB_MAX_PENDING', '100')),
+    aging_seconds=float(os.environ.get('KNOT_JOB_AGING_SECONDS', '30')),
+    max_running_per_client=int(os.environ.get('KNOT_JOB_MAX_PER_CLIENT', '2')),
+    on_finished=lambda result, http_status, durations: observe_solve(durations, result, http_status, 'job'),
+)
+
+# 直接计算的请求在请求没有给出 deadline 时使用的截止时间（秒）
+REQUEST_DEADLINE = float(os.environ.get('KNOT_REQUEST_DEADLINE', '60'))
+
+def client_disconnected(environ):
     """
-    生成编绳结的方式，使得绳子颜色排列符合 composition_color，
-    且最终绳子物理排列顺序与 start_state 相同。
+    客户端是否已经断开连接。请求体已经读完，连接上出现可读事件却读不到数据说明对方已关闭；
+    服务器没有提供底层 socket 时返回 False。
     """
-    n_strings = len(start_state)
-    if n_strings % 2 != 0:
-        raise ValueError("start_state 的长度必须是偶数。")
-
-    n_lines = len(composition_color)
-    n_knots_per_odd_line = n_strings // 2
-    n_knots_per_even_line = (n_strings // 2) - 1
-
-    knot_rules = {
-        'RR': {'knot_color_idx': 0, 'new_order': [1, 0], 'type': 'swapping'},
-        'LL': {'knot_color_idx': 1, 'new_order': [1, 0], 'type': 'swapping'},
-        'RL': {'knot_color_idx': 0, 'new_order': [0, 1], 'type': 'non-swapping'},
-        'LR': {'knot_color_idx': 1, 'new_order': [0, 1], 'type': 'non-swapping'},
-    }
-    
-    knot_mapping_symbols = {
-        'RR': '右右',
-        'LL': '左左',
-        'RL': '右左',
-        'LR': '左右',
-    }
-
-    all_found_solutions = []
-
-    def backtrack(current_line_idx, current_state, current_method_path, current_states_path):
-        nonlocal all_found_solutions
-
-        # Base case: All lines processed
-        if current_line_idx == n_lines:
-            if current_state == start_state:
-                # Found a valid solution path
-                all_found_solutions.append({
-                    'method': [list(row) for row in current_method_path],
-                    'states_path': [list(s) for s in current_states_path + [list(current_state)]],
-                    'end_state': list(current_state)
-                })
-            return
-
-        is_odd_line = (current_line_idx % 2 == 0)
-        target_knot_colors = composition_color[current_line_idx]
-
-        if is_odd_line:
-            num_knots_in_line = n_knots_per_odd_line
-            start_idx = 0
-        else:
-            num_knots_in_line = n_knots_per_even_line
-            start_idx = 1
-        
-        if len(target_knot_colors) != num_knots_in_line:
-            return
-
-        temp_method_row = [''] * num_knots_in_line
-        
-        def find_knots_for_current_line(knot_idx, state_snapshot_for_line):
-            nonlocal temp_method_row
-
-            if knot_idx == num_knots_in_line:
-                next_state = []
-                new_parent_strings_after_knots = []
-                
-                for i in range(num_knots_in_line):
-                    parent_string_start_idx = start_idx + 2 * i
-                    if parent_string_start_idx + 1 >= len(state_snapshot_for_line):
-                        return
-
-                    parent_string = [state_snapshot_for_line[parent_string_start_idx],
-                                     state_snapshot_for_line[parent_string_start_idx + 1]]
-                    
-                    knot_type_str = temp_method_row[i]
-                    rule = knot_rules[knot_type_str]
-                    
-                    new_order_indices = rule['new_order']
-                    new_parent = [parent_string[new_order_indices[0]], parent_string[new_order_indices[1]]]
-                    new_parent_strings_after_knots.append(new_parent)
-                
-                if is_odd_line:
-                    for i in range(num_knots_in_line):
-                        next_state.extend(new_parent_strings_after_knots[i])
-                else: 
-                    next_state.append(state_snapshot_for_line[0]) 
-                    for i in range(num_knots_in_line):
-                        next_state.extend(new_parent_strings_after_knots[i])
-                    if n_strings > (start_idx + 2 * num_knots_in_line): 
-                         next_state.append(state_snapshot_for_line[-1])
-                    if len(next_state) != n_strings:
-                        return 
-
-                # Recursive call to backtrack for the next line
-                backtrack(current_line_idx + 1, next_state, 
-                          current_method_path + [list(temp_method_row)], 
-                          current_states_path + [list(next_state)])
-
-                return
-            
-            parent_string_start_idx = start_idx + 2 * knot_idx
-            
-            if parent_string_start_idx + 1 >= len(state_snapshot_for_line):
-                return
-
-            parent_string = [state_snapshot_for_line[parent_string_start_idx],
-                             state_snapshot_for_line[parent_string_start_idx + 1]]
-            
-            for knot_type, rule in knot_rules.items():
-                knot_color_index = rule['knot_color_idx']
-                
-                if parent_string[knot_color_index] == target_knot_colors[knot_idx]:
-                    temp_method_row[knot_idx] = knot_type
-                    # Recursive call to find knots for the next pair in the current line
-                    find_knots_for_current_line(knot_idx + 1, state_snapshot_for_line)
-            return
-
-        find_knots_for_current_line(0, current_state)
-
-    # Initiate the backtracking process
-    backtrack(0, list(start_state), [], [list(start_state)]) 
-
-    if not all_found_solutions:
-        return None, []
-
-    # Convert internal knot type abbreviations to symbols for display
-    for solution in all_found_solutions:
-        for r_idx, row in enumerate(solution['method']):
-            for c_idx, knot_type_abbr in enumerate(row):
-                solution['method'][r_idx][c_idx] = knot_mapping_symbols[knot_type_abbr]
-
-    # Find the most concise method
-    def calculate_conciseness_score(method_data):
-        score = 0
-        for line_knots_abbrev in method_data['method']:
-            # Convert back to internal abbreviation for scoring
-            line_knots = [next(k for k, v in knot_mapping_symbols.items() if v == sym) for sym in line_knots_abbrev]
-            
-            # 1. Unique knot types score
-            unique_types = set(line_knots)
-            score += len(unique_types)
-
-            # 2. Symmetry penalty score
-            swapping_types = {'RR', 'LL'}
-            non_swapping_types = {'RL', 'LR'}
-            
-            has_swapping = any(kt in swapping_types for kt in line_knots)
-            has_non_swapping = any(kt in non_swapping_types for kt in line_knots)
-
-            if has_swapping and has_non_swapping:
-                score += 1
-        return score
-
-    # Find the best solution
-    best_solution_obj = None
-    min_score = math.inf
-
-    for solution in all_found_solutions:
-        score = calculate_conciseness_score(solution)
-        if score < min_score:
-            min_score = score
-            best_solution_obj = solution
-        # You could add tie-breaking rules here if needed, e.g., if scores are equal,
-        # choose the one with fewer total knot changes, or a specific visual pattern preference.
-
-    print("\n--- 最简洁的编绳方法 ---")
-    if best_solution_obj:
-        print(f"总简洁度分数: {min_score}")
-        print(f"最简洁的打结方式:\n {best_solution_obj['method']}")
-        print(f"该方法对应的完整状态路径:")
-        print(f"初始状态: {best_solution_obj['states_path'][0]}")
-        for i in range(len(best_solution_obj['method'])):
-            print(f"第 {i+1} 行打结方式: {best_solution_obj['method'][i]}")
-            print(f"更新后状态: {best_solution_obj['states_path'][i+1]}")
-        print(f"结束状态 (end_state): {best_solution_obj['end_state']}")
-        print(f"与初始状态一致: {best_solution_obj['end_state'] == start_state}")
-    else:
-        print("未能找到最简洁的方法（此情况不应发生，如果 all_found_solutions 不为空）。")
-    print("---------------------\n")
-
-    return best_solution_obj, all_found_solutions
+    sock = environ.get('werkzeug.socket') or environ.get('gunicorn.socket')
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        return bool(readable) and sock.recv(1, socket.MSG_PEEK) == b''
+    except (OSError, ValueError):
+        return True
+
+def client_id():
+    """请求方标识：优先使用 X-Client-Id 请求头，否则使用客户端地址。"""
+    return request.headers.get('X-Client-Id') or request.remote_addr
+
+# 正在处理的 HTTP 请求数
+requests_in_flight = 0
+requests_in_flight_lock = threading.Lock()
+
+@app.before_request
+def start_request_timing():
+    global requests_in_flight
+    with requests_in_flight_lock:
+        requests_in_flight += 1
+    g.request_started = time.perf_counter()
+    # 求解接口把它作为 progress 回调，记录各阶段耗时
+    g.phase_timer = PhaseTimer()
+
+@app.after_request
+def record_request_timing(response):
+    total = time.perf_counter() - g.request_started
+    g.phase_timer.stop()
+    # 流式响应（批量求解）在这里只计到开始输出为止
+    response.headers['Server-Timing'] = g.phase_timer.server_timing(total)
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    request_latency.observe(total, endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
+@app.teardown_request
+def finish_request(exc):
+    global requests_in_flight
+    with requests_in_flight_lock:
+        requests_in_flight -= 1
 
 @app.route('/api/generate-knot', methods=['POST'])
 def generate_knot():
     try:
-        data = request.get_json()
-        start_state = data.get('startState')
-        composition_color = data.get('targetPattern')
-        
-        if not start_state or not composition_color:
-            return jsonify({'error': '缺少必要参数'}), 400
-        
-        # 调用绳结算法
-        best_solution_obj, all_solutions = generate_knot_methods(start_state, composition_color)
-        
-        if best_solution_obj is None:
-            return jsonify({'error': '未找到符合条件的打结方式'}), 404
-        
-        result = {
-            'startState': start_state,
-            'targetPattern': composition_color,
-            'bestSolution': best_solution_obj['method'],
-            'statesPath': best_solution_obj['states_path'],
-            'totalSolutions': len(all_solutions)
-        }
-        
-        return jsonify(result)
-        
+        params = parse_knot_request(request.get_json())
+        timer = g.phase_timer
+        timer('estimate')
+        estimate = estimate_request(params)
+        timer.stop()
+        if estimate['mode'] == 'reject':
+            return jsonify(rejection_payload(estimate)), 422
+        if estimate['mode'] == 'async':
+            # 耗时较长的请求转为后台任务，客户端通过 /api/jobs/<jobId> 查询结果
+            job_id = job_manager.submit(params, client_id=client_id(),
+                                        estimated_seconds=estimate['estimatedSeconds'])
+            return jsonify({'jobId': job_id, 'status': 'queued', 'estimate': estimate}), 202
+
+        # 客户端断开或超过截止时间时停止搜索
+        environ = request.environ
+        cancel_token = CancellationToken(deadline=params['deadline'] or REQUEST_DEADLINE,
+                                         poll=lambda: client_disconnected(environ))
+        result, http_status = solve_knot_request(params, progress=timer, cancel_token=cancel_token)
+        timer.stop()
+        observe_solve(timer.durations, result, http_status, 'inline')
+        return jsonify(result), http_status
+
+    except KnotRequestError as e:
+        return jsonify({'error': str(e)}), 400
+    except JobQueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/generate-knot/batch', methods=['POST'])
+def generate_knot_batch():
+    data = request.get_json(silent=True)
+    patterns = data.get('patterns') if isinstance(data, dict) else None
+    if not isinstance(patterns, list) or not patterns:
+        return jsonify({'error': '缺少 patterns 参数'}), 400
+    if len(patterns) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'一次最多提交 {MAX_BATCH_SIZE} 个图案'}), 413
+
+    # 每算完一个（按提交顺序）就输出一行 JSON
+    def generate():
+        for index, payload, http_status in iter_batch_results(patterns, shared_executor()):
+            observe_solve({}, payload, http_status, 'batch')
+            record = {'index': index, 'status': http_status, 'result': payload}
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/estimate', methods=['POST'])
+def estimate():
+    try:
+        params = parse_knot_request(request.get_json())
+        return jsonify(estimate_request(params))
+
+    except KnotRequestError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    try:
+        params = parse_knot_request(request.get_json())
+        estimate = estimate_request(params)
+        if estimate['mode'] == 'reject':
+            return jsonify(rejection_payload(estimate)), 422
+        job_id = job_manager.submit(params, client_id=client_id(),
+                                    estimated_seconds=estimate['estimatedSeconds'])
+        return jsonify({'jobId': job_id, 'status': 'queued', 'estimate': estimate}), 202
+
+    except KnotRequestError as e:
+        return jsonify({'error': str(e)}), 400
+    except JobQueueFullError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/jobs', methods=['GET'])
+def job_queue_stats():
+    return jsonify(job_manager.queue_stats())
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在或结果已过期'}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在或结果已过期'}), 404
+    return jsonify(job)
+
+@app.route('/api/cache', methods=['GET'])
+def cache_stats():
+    stats = result_cache.stats()
+    stats['store'] = solution_store.stats() if solution_store is not None else None
+    return jsonify(stats)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus 文本格式的指标。"""
+    cache = result_cache.stats()
+    queue = job_manager.queue_stats()
+    lines = request_latency.collect() + solver_phase_seconds.collect() + solution_count.collect()
+    lines += sample_family('knot_http_requests_in_flight', '正在处理的 HTTP 请求数', 'gauge',
+                           [({}, requests_in_flight)])
+    lines += sample_family('knot_cache_hits_total', '结果缓存命中次数', 'counter', [({}, cache['hits'])])
+    lines += sample_family('knot_cache_misses_total', '结果缓存未命中次数', 'counter', [({}, cache['misses'])])
+    lines += sample_family('knot_cache_hit_ratio', '结果缓存命中率', 'gauge', [({}, cache['hitRatio'])])
+    lines += sample_family('knot_cache_entries', '结果缓存中的条目数', 'gauge', [({}, cache['size'])])
+    lines += sample_family('knot_solves_in_flight', '正在计算的规范问题数（合并后的并发请求只算一次）', 'gauge',
+                           [({}, in_flight_solves.in_flight())])
+    lines += sample_family('knot_solves_coalesced_total', '等待其他请求计算结果、没有重复计算的请求数', 'counter',
+                           [({}, in_flight_solves.coalesced)])
+    lines += sample_family('knot_jobs_running', '正在运行的后台任务数', 'gauge', [({}, queue['running'])])
+    lines += sample_family('knot_jobs_queued', '各优先级通道排队的后台任务数', 'gauge',
+                           [({'lane': lane}, count) for lane, count in enumerate(queue['queuedByLane'])])
+    return Response('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'ok'})
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    # 求解器预热完成之前返回 503，负载均衡器据此决定何时开始转发请求
+    if not knot_service.warmed_up:
+        return jsonify({'status': 'warming_up'}), 503
+    return jsonify({'status': 'ready'})
+
 if __name__ == '__main__':
+    knot_service.warm_up()
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+批量求解：POST /api/generate-knot/batch 和命令行共用。
+
+请求在主进程中校验、按规范形式去重并查缓存，只有缓存里没有的规范问题才交给进程池。
+代价估计也在工作进程中进行，主进程不会因为逐个试探而成为瓶颈；超过上限的请求由工作进程拒绝。
+工作进程返回紧凑的缓存条目，再由主进程映射成每个请求的结果。结果按输入顺序逐行产生，
+前面的结果不必等后面的请求算完。
+
+命令行用法：
+    python batch.py patterns.jsonl [-o results.jsonl] [--workers N]
+                    [--profile-dir DIR [--profile-sample RATE] [--profile-max-per-minute N]]
+
+输入每行一个与 /api/generate-knot 请求体相同的 JSON 对象，输出每行一个
+{"index", "status", "result"}，result 与 /api/generate-knot 的响应相同。
+设置 KNOT_STORE_PATH 时所有工作进程共享同一个持久化结果存储。
+给出 --profile-dir 时，带 "profile": true 的请求和按 --profile-sample 抽样的求解在工作进程中做性能分析，
+见 profiling.py。
+"""
+
+import os
+import sys
+import json
+import argparse
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import knot_service
+import profiling
+from knot_service import (KnotRequestError, parse_knot_request, estimate_request, rejection_payload, uses_cache,
+                          canonical_request, response_from_entry, solve_knot_request, result_cache)
+from knot_solver import CancellationToken, SearchCancelled
+
+# 一次批量请求最多包含的图案数
+MAX_BATCH_SIZE = int(os.environ.get('KNOT_BATCH_MAX', '1000'))
+
+
+def _init_worker():
+    # spawn 出的工作进程不继承主进程的日志配置；日志输出到 stderr，stdout 留给命令行模式的结果
+    knot_service.configure_logging()
+
+
+def _solve_entry(cache_key, params):
+    """
+    工作进程：估计代价，不超过上限时求解一个规范问题。params 是缓存键为 cache_key 的任意一个请求，
+    规范形式相同的请求估计结果也相同。
+
+    Returns:
+        tuple: (缓存条目, None)；超过上限时为 (None, estimate_request 的结果)
+    """
+    estimate = estimate_request(params)
+    if estimate['mode'] == 'reject':
+        return None, estimate
+    return knot_service.solve_cache_entry(cache_key), None
+
+
+def _solve_params(params):
+    """工作进程：设置了预算、截止时间或要求统计、性能分析的请求不去重，估计代价后按原样求解。"""
+    estimate = estimate_request(params)
+    if estimate['mode'] == 'reject':
+        return rejection_payload(estimate), 422
+    cancel_token = CancellationToken(deadline=params['deadline']) if params['deadline'] else None
+    return solve_knot_request(params, cancel_token=cancel_token)
+
+
+def create_executor(max_workers=None):
+    """批量求解用的进程池，默认每个 CPU 核一个进程。"""
+    return ProcessPoolExecutor(max_workers=max_workers or multiprocessing.cpu_count(),
+                               mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_worker)
+
+
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def shared_executor():
+    """服务进程内所有批量请求共用的进程池，第一次使用时才创建。"""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            workers = int(os.environ.get('KNOT_BATCH_WORKERS', '0')) or None
+            _shared_executor = create_executor(workers)
+        return _shared_executor
+
+
+def iter_batch_results(request_bodies, executor, window=None):
+    """
+    求解一批请求，按输入顺序逐个产生结果。
+
+    同时最多有 window 个请求在处理中（默认为 CPU 核数的 4 倍），输入可以是很长的迭代器。
+    规范形式相同、且没有设置预算、截止时间、统计和性能分析的请求只求解一次。
+
+    Args:
+        request_bodies (iterable): 请求体 dict 的序列。
+        executor (ProcessPoolExecutor): create_executor 或 shared_executor 返回的进程池。
+
+    Yields:
+        tuple: (序号, 响应数据 dict, HTTP 状态码)
+    """
+    window = window or multiprocessing.cpu_count() * 4
+    # 处理中的请求：(序号, params, 缓存键或 None, future 或已完成的结果)
+    pending = deque()
+    # 缓存键 -> 正在计算它的 future
+    in_flight = {}
+
+    def submit(index, body):
+        try:
+            params = parse_knot_request(body)
+        except KnotRequestError as e:
+            return index, None, None, ({'error': str(e)}, 400)
+
+        if not uses_cache(params) or params['deadline'] is not None or params['profile']:
+            return index, params, None, executor.submit(_solve_params, params)
+
+        cache_key, _ = canonical_request(params)
+        entry = result_cache.get(cache_key)
+        if entry is not None:
+            return index, params, cache_key, entry
+        if cache_key not in in_flight:
+            in_flight[cache_key] = executor.submit(_solve_entry, cache_key, params)
+        return index, params, cache_key, in_flight[cache_key]
+
+    def finish(index, params, cache_key, outcome):
+        cache = 'hit'
+        if isinstance(outcome, Future):
+            cache = 'miss'
+            try:
+                result = outcome.result()
+            except SearchCancelled:
+                return index, {'error': '请求已取消'}, 499
+            except Exception as e:
+                return index, {'error': str(e)}, 500
+            finally:
+                if cache_key is not None and in_flight.get(cache_key) is outcome:
+                    del in_flight[cache_key]
+            if cache_key is not None:
+                result, estimate = result
+                if result is None:
+                    return index, rejection_payload(estimate), 422
+                result_cache.put(cache_key, result)
+            outcome = result
+
+        if cache_key is None:
+            payload, http_status = outcome
+        else:
+            payload, http_status = response_from_entry(params, outcome, cache)
+        return index, payload, http_status
+
+    for index, body in enumerate(request_bodies):
+        if len(pending) >= window:
+            yield finish(*pending.popleft())
+        pending.append(submit(index, body))
+    while pending:
+        yield finish(*pending.popleft())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='批量求解 JSONL 文件中的编绳图案，每行输出一个结果。')
+    parser.add_argument('input', help='输入文件，每行一个请求体；- 表示标准输入')
+    parser.add_argument('-o', '--output', help='输出文件，默认为标准输出')
+    parser.add_argument('--workers', type=int, default=None, help='工作进程数，默认为 CPU 核数')
+    parser.add_argument('--profile-dir', default=None, help='性能分析结果的输出目录，不给出时不分析')
+    parser.add_argument('--profile-sample', type=float, default=None,
+                        help='没有要求分析的求解按这个比例抽样分析，默认为 KNOT_PROFILE_SAMPLE_RATE')
+    parser.add_argument('--profile-max-per-minute', type=int, default=None,
+                        help='每个工作进程每分钟最多分析的次数，默认为 KNOT_PROFILE_MAX_PER_MINUTE')
+    args = parser.parse_args(argv)
+    # 工作进程以 spawn 方式启动，从环境变量读取分析设置
+    profiling.configure(args.profile_dir, args.profile_sample, args.profile_max_per_minute)
+    knot_service.configure_logging()
+
+    input_file = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output_file = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+
+    def request_bodies():
+        for line in input_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # 无法解析的行交给 parse_knot_request，输出一条 400 结果
+                yield None
+
+    try:
+        with create_executor(args.workers) as executor:
+            for index, payload, http_status in iter_batch_results(request_bodies(), executor):
+                record = {'index': index, 'status': http_status, 'result': payload}
+                output_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                output_file.flush()
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+
+if __name__ == '__main__':
+    main()
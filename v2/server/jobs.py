@@ -0,0 +1,261 @@
+"""
+后台求解任务：POST /api/jobs 立即返回任务 id，计算在有界的进程池里进行，
+GET /api/jobs/<id> 查询状态、进度和结果；完成的结果保留 result_ttl 秒。
+参数完全相同的任务在未完成时重复提交，会直接返回已有任务的 id。
+任务先在 JobScheduler 中排队，有空闲的工作进程时按预计耗时（短任务优先）和等待时间取出运行。
+DELETE /api/jobs/<id> 取消任务：排队中的直接移除，运行中的在几十毫秒内停止搜索。
+"""
+
+import time
+import uuid
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from knot_service import (configure_logging, request_key, solve_knot_request, estimate_request, cached_entry,
+                          result_cache)
+from knot_solver import CancellationToken
+from scheduler import JobScheduler
+from metrics import PhaseTimer
+
+
+class JobQueueFullError(RuntimeError):
+    """排队的任务太多，对应 HTTP 503。"""
+
+
+def _init_worker():
+    # spawn 出的工作进程不继承主进程的日志配置
+    configure_logging()
+
+
+def _run_job(job_id, params, progress_board, cancel_board):
+    """
+    在工作进程中运行：求解并把当前阶段写到共享的 progress_board。
+    任务 id 出现在 cancel_board 中或超过请求的 deadline（从开始计算时算起）时停止搜索。
+
+    Returns:
+        tuple: (响应数据, HTTP 状态码, 各阶段耗时 dict, cached_entry 的结果)
+    """
+    def progress(phase):
+        progress_board[job_id] = phase
+
+    cancel_token = CancellationToken(deadline=params['deadline'], poll=lambda: job_id in cancel_board,
+                                     poll_interval=0.05)
+    timer = PhaseTimer(forward=progress)
+    try:
+        result, http_status = solve_knot_request(params, progress=timer, cancel_token=cancel_token)
+    finally:
+        timer.stop()
+    return result, http_status, timer.durations, cached_entry(params)
+
+
+class JobManager:
+    """
+    管理后台求解任务。
+
+    进程池和用于汇报进度的 Manager 在第一次提交任务时才创建，不影响服务启动速度。
+    子进程用 spawn 方式启动，避免在多线程的 Flask 进程中 fork。
+    """
+
+    def __init__(self, max_workers=2, result_ttl=600, max_pending=100, aging_seconds=30,
+                 max_running_per_client=2, on_finished=None):
+        self.max_workers = max_workers
+        # 任务在工作进程中算完后以 (响应数据, HTTP 状态码, 各阶段耗时) 调用，用于记录指标
+        self.on_finished = on_finished
+        self.result_ttl = result_ttl
+        self.max_pending = max_pending
+        self._jobs = {}
+        self._scheduler = JobScheduler(aging_seconds=aging_seconds,
+                                       max_running_per_client=max_running_per_client)
+        self._running = 0
+        # 进程池的完成回调可能在持有锁的线程里直接执行，所以用可重入锁
+        self._lock = threading.RLock()
+        self._executor = None
+        self._manager = None
+        self._progress_board = None
+        self._cancel_board = None
+
+    def _ensure_started(self):
+        if self._executor is None:
+            context = multiprocessing.get_context('spawn')
+            self._manager = context.Manager()
+            self._progress_board = self._manager.dict()
+            self._cancel_board = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                                 initializer=_init_worker)
+
+    def _expire_finished(self):
+        """删除超过保留时间的已完成任务，调用时需持有锁。"""
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished_at'] is not None and now - job['finished_at'] > self.result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def pending_count(self):
+        """尚未完成（排队或运行中）的任务数量。"""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job['finished_at'] is None)
+
+    def queue_stats(self):
+        """运行中的任务数和各优先级通道排队的任务数。"""
+        with self._lock:
+            return {'running': self._running, 'queuedByLane': self._scheduler.lane_counts()}
+
+    def submit(self, params, client_id=None, estimated_seconds=None):
+        """
+        提交一个求解任务。
+
+        Args:
+            params (dict): knot_service.parse_knot_request 的返回值。
+            client_id (str): 可选，提交者的标识，用于限制同一客户端同时运行的任务数。
+            estimated_seconds (float): 可选，预计耗时；不给出时调用 estimate_request 估计。
+
+        Returns:
+            str: 任务 id；相同参数的任务尚未完成时返回该任务的 id。
+
+        Raises:
+            JobQueueFullError: 未完成的任务已经达到 max_pending。
+        """
+        if estimated_seconds is None:
+            estimated_seconds = estimate_request(params)['estimatedSeconds']
+
+        with self._lock:
+            self._expire_finished()
+            key = request_key(params)
+            for job_id, job in self._jobs.items():
+                if job['finished_at'] is None and job['key'] == key:
+                    return job_id
+            if sum(1 for job in self._jobs.values() if job['finished_at'] is None) >= self.max_pending:
+                raise JobQueueFullError('任务太多，请稍后再试')
+            self._ensure_started()
+
+            job_id = uuid.uuid4().hex
+            phases = ['search', 'count'] + (['topK'] if params.get('top_k') is not None else []) + ['format']
+            self._jobs[job_id] = {
+                'status': 'queued',
+                'key': key,
+                'params': params,
+                'client_id': client_id,
+                'estimated_seconds': estimated_seconds,
+                'phases': phases,
+                'created_at': time.monotonic(),
+                'finished_at': None,
+                'result': None,
+                'http_status': None,
+                'error': None,
+            }
+            self._scheduler.push(job_id, estimated_seconds, client_id)
+            self._dispatch()
+
+        return job_id
+
+    def _dispatch(self):
+        """有空闲的工作进程时，按调度顺序把排队的任务交给进程池，调用时需持有锁。"""
+        while self._running < self.max_workers:
+            job_id = self._scheduler.pop_next()
+            if job_id is None:
+                return
+            job = self._jobs[job_id]
+            self._running += 1
+            future = self._executor.submit(_run_job, job_id, job.pop('params'), self._progress_board,
+                                           self._cancel_board)
+            future.add_done_callback(lambda done, job_id=job_id: self._finish(job_id, done))
+
+    def _finish(self, job_id, future):
+        try:
+            result, http_status, durations, entry = future.result()
+            error = result.get('error') if http_status != 200 else None
+        except Exception as e:
+            result, http_status, error, durations, entry = None, 500, str(e), {}, None
+        if entry is not None:
+            # 结果只在工作进程的缓存里；放进服务进程的缓存，相同的请求之后直接返回
+            result_cache.put(*entry)
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            self._running -= 1
+            if job is not None:
+                self._scheduler.finished(job['client_id'])
+                if http_status == 200:
+                    job['status'] = 'done'
+                elif http_status == 499:
+                    job['status'] = 'cancelled'
+                else:
+                    job['status'] = 'failed'
+                job['finished_at'] = time.monotonic()
+                job['result'] = result if http_status == 200 else None
+                job['http_status'] = http_status
+                job['error'] = error
+            self._dispatch()
+        self._progress_board.pop(job_id, None)
+        self._cancel_board.pop(job_id, None)
+        if self.on_finished is not None:
+            self.on_finished(result or {}, http_status, durations)
+
+    def cancel(self, job_id):
+        """
+        取消任务。排队中的任务立即标记为 cancelled；运行中的任务通知工作进程停止，
+        状态先变为 cancelling，工作进程退出搜索后变为 cancelled。已完成的任务保持原状态。
+
+        Returns:
+            dict: 与 get 相同的任务快照；任务不存在或已过期时返回 None。
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job['finished_at'] is None:
+                if self._scheduler.remove(job_id):
+                    job.pop('params', None)
+                    job['status'] = 'cancelled'
+                    job['finished_at'] = time.monotonic()
+                    job['http_status'] = 499
+                    job['error'] = '任务已取消'
+                else:
+                    job['status'] = 'cancelling'
+                    self._cancel_board[job_id] = True
+        return self.get(job_id)
+
+    def get(self, job_id):
+        """
+        查询任务。
+
+        Returns:
+            dict: {'jobId', 'status', 'progress', 'result', 'error'}；任务不存在或已过期时返回 None。
+        """
+        with self._lock:
+            self._expire_finished()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+
+        phases = job['phases']
+        if job['finished_at'] is not None:
+            phase, fraction = job['status'], 1.0
+        else:
+            phase = self._progress_board.get(job_id)
+            if phase is None:
+                phase, fraction = 'queued', 0.0
+            else:
+                if job['status'] == 'queued':
+                    job['status'] = 'running'
+                fraction = phases.index(phase) / len(phases) if phase in phases else 0.0
+
+        snapshot = {
+            'jobId': job_id,
+            'status': job['status'],
+            'progress': {'phase': phase, 'fraction': round(fraction, 2)},
+        }
+        if job['result'] is not None:
+            snapshot['result'] = job['result']
+        if job['error'] is not None:
+            snapshot['error'] = job['error']
+            snapshot['httpStatus'] = job['http_status']
+        return snapshot
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._manager.shutdown()
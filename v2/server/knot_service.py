@@ -0,0 +1,605 @@
+"""
+绳结求解服务：请求参数校验、调用求解器、组装接口返回的数据。
+
+这里不依赖 Flask，同步接口和后台任务进程都直接调用它。
+"""
+
+import sys
+import os
+import json
+import time
+import logging
+import contextlib
+
+# 添加Python算法文件路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# 只导入包本身；求解器的子模块在第一次调用时才加载，服务和工作进程启动更快
+import knot_solver
+
+from result_cache import ResultCache
+from solution_store import SolutionStore, content_key
+from single_flight import SingleFlight
+import profiling
+
+logger = logging.getLogger(__name__)
+
+# 日志级别：INFO 时每次求解写一条摘要记录，DEBUG 时另外写出最优方案的完整状态路径
+LOG_LEVEL = os.environ.get('KNOT_LOG_LEVEL', 'INFO').upper()
+
+# topK 参数的上限，保证备选方案占用的内存有界
+MAX_TOP_K = 50
+
+# 大于 1 时把每个请求的搜索树按第一行拆开，分给这么多个进程并行求解（结果与串行相同）
+SOLVER_WORKERS = int(os.environ.get('KNOT_SOLVER_WORKERS', '0'))
+
+# 准入控制：预计耗时不超过 INLINE_MAX_SECONDS 的请求直接计算，超过 MAX_ESTIMATED_SECONDS 的请求拒绝，
+# 介于两者之间的转为后台任务
+INLINE_MAX_SECONDS = float(os.environ.get('KNOT_INLINE_MAX_SECONDS', '2'))
+MAX_ESTIMATED_SECONDS = float(os.environ.get('KNOT_MAX_ESTIMATED_SECONDS', '300'))
+
+# 请求没有给出 stats 参数时是否收集搜索统计；统计会拖慢搜索，默认关闭
+SEARCH_STATS = os.environ.get('KNOT_SEARCH_STATS', '0') == '1'
+
+# 未设置预算的请求按颜色重命名后的规范形式缓存结果：条目数上限与保留秒数
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('KNOT_CACHE_SIZE', '256')),
+    ttl=float(os.environ.get('KNOT_CACHE_TTL', '3600')),
+)
+
+# 相同的问题同时被多次请求时只计算一次
+in_flight_solves = SingleFlight()
+
+# 可选的持久化结果存储：设置 KNOT_STORE_PATH 后，多个服务进程共享同一个 SQLite 文件，重启后仍然有效
+solution_store = None
+if os.environ.get('KNOT_STORE_PATH'):
+    solution_store = SolutionStore(
+        os.environ['KNOT_STORE_PATH'],
+        max_bytes=int(os.environ.get('KNOT_STORE_MAX_BYTES', str(64 * 1024 * 1024))),
+    )
+
+
+def configure_logging():
+    """服务进程、后台任务和批量求解的工作进程共用的日志配置：输出到 stderr，级别为 KNOT_LOG_LEVEL。"""
+    logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s %(levelname)s %(process)d %(name)s %(message)s')
+
+
+class KnotRequestError(ValueError):
+    """请求参数不合法，对应 HTTP 400。"""
+
+
+def parse_knot_request(data):
+    """
+    校验 /api/generate-knot 的请求体。
+
+    Returns:
+        dict: {'start_state', 'composition_color', 'top_k', 'time_budget', 'node_budget', 'deadline', 'stats',
+               'profile'}
+
+    Raises:
+        KnotRequestError: 参数缺失或不合法。
+    """
+    if not isinstance(data, dict):
+        raise KnotRequestError('缺少必要参数')
+
+    start_state = data.get('startState')
+    composition_color = data.get('targetPattern')
+    if not start_state or not composition_color:
+        raise KnotRequestError('缺少必要参数')
+
+    top_k = data.get('topK')
+    if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, int)
+                              or not 1 <= top_k <= MAX_TOP_K):
+        raise KnotRequestError(f'topK 必须是 1 到 {MAX_TOP_K} 之间的整数')
+
+    time_budget = data.get('timeBudget')
+    if time_budget is not None and (isinstance(time_budget, bool) or not isinstance(time_budget, (int, float))
+                                    or time_budget <= 0):
+        raise KnotRequestError('timeBudget 必须是正数（秒）')
+
+    node_budget = data.get('nodeBudget')
+    if node_budget is not None and (isinstance(node_budget, bool) or not isinstance(node_budget, int)
+                                    or node_budget <= 0):
+        raise KnotRequestError('nodeBudget 必须是正整数')
+
+    deadline = data.get('deadline')
+    if deadline is not None and (isinstance(deadline, bool) or not isinstance(deadline, (int, float))
+                                 or deadline <= 0):
+        raise KnotRequestError('deadline 必须是正数（秒）')
+
+    stats = data.get('stats', SEARCH_STATS)
+    if not isinstance(stats, bool):
+        raise KnotRequestError('stats 必须是布尔值')
+
+    profile = data.get('profile', False)
+    if not isinstance(profile, bool):
+        raise KnotRequestError('profile 必须是布尔值')
+
+    return {
+        'start_state': start_state,
+        'composition_color': composition_color,
+        'top_k': top_k,
+        'time_budget': time_budget,
+        'node_budget': node_budget,
+        'deadline': deadline,
+        'stats': stats,
+        'profile': profile,
+    }
+
+
+def request_key(params):
+    """parse_knot_request 结果的可哈希形式，参数完全相同的请求得到相同的键。"""
+    return (
+        tuple(params['start_state']),
+        tuple(tuple(line) for line in params['composition_color']),
+        params['top_k'],
+        params['time_budget'],
+        params['node_budget'],
+        params['deadline'],
+        params['stats'],
+        params['profile'],
+    )
+
+
+def uses_cache(params):
+    """
+    请求的结果能否使用缓存：设置了预算的结果取决于预算，要求搜索统计的必须真正搜索一次。
+    要求性能分析的请求只有在分析器真正接受时才绕过缓存，见 _solve_knot_request。
+    """
+    return params['time_budget'] is None and params['node_budget'] is None and not params['stats']
+
+
+def estimate_request(params):
+    """
+    估计请求的计算代价并决定如何处理。
+
+    结果已在缓存中时不做试探（试探本身要几十毫秒，比从缓存返回结果还慢），
+    这时 dpTransitions、enumerationNodes 和 exact 为 None。
+
+    Returns:
+        dict: {'mode': 'inline'/'async'/'reject', 'estimatedSeconds', 'cached', 'nStrings', 'nLines',
+               'paletteSize', 'stateSpace', 'dpTransitions', 'enumerationNodes', 'exact'}
+    """
+    start_state = params['start_state']
+    composition_color = params['composition_color']
+    if uses_cache(params) and canonical_request(params)[0] in result_cache:
+        return {
+            'mode': 'inline',
+            'estimatedSeconds': 0.0,
+            'cached': True,
+            'nStrings': len(start_state),
+            'nLines': len(composition_color),
+            'paletteSize': len(set(start_state).union(*composition_color)),
+            'stateSpace': knot_solver.count_multiset_permutations(start_state),
+            'dpTransitions': None,
+            'enumerationNodes': None,
+            'exact': None,
+        }
+
+    cost = knot_solver.estimate_search_cost(start_state, composition_color,
+                                            with_top_k=params['top_k'] is not None,
+                                            time_budget=params['time_budget'])
+    estimated_seconds = cost['estimated_seconds']
+
+    if estimated_seconds <= INLINE_MAX_SECONDS:
+        mode = 'inline'
+    elif estimated_seconds <= MAX_ESTIMATED_SECONDS:
+        mode = 'async'
+    else:
+        mode = 'reject'
+
+    return {
+        'mode': mode,
+        'estimatedSeconds': round(estimated_seconds, 3),
+        'cached': False,
+        'nStrings': cost['n_strings'],
+        'nLines': cost['n_lines'],
+        'paletteSize': cost['palette_size'],
+        'stateSpace': cost['state_space'],
+        'dpTransitions': cost['dp_transitions'],
+        'enumerationNodes': cost['enumeration_nodes'],
+        'exact': cost['exact'],
+    }
+
+
+def rejection_payload(estimate):
+    """预计耗时超过上限时返回给客户端的错误说明。"""
+    return {
+        'error': f"图案太复杂，预计需要计算 {estimate['estimatedSeconds']:.0f} 秒，"
+                 f"超过了 {MAX_ESTIMATED_SECONDS:.0f} 秒的上限；请减少行数或不要请求 topK",
+        'estimate': estimate,
+    }
+
+
+def generate_knot_methods(start_state, composition_color, time_budget=None, node_budget=None, progress=None,
+                          cancel_token=None, stats=None):
+    """
+    生成编绳结的方式，使得绳子颜色排列符合 composition_color，
+    且最终绳子物理排列顺序与 start_state 相同。
+
+    最优解由 knot_solver 的动态规划求出，方案总数通过逐行状态转移的路径计数得到，
+    不再把每一种方案都生成出来保存在内存里。
+    给出 time_budget（秒）或 node_budget 时改用分支定界搜索，预算用完就返回目前最好的方案。
+    设置环境变量 KNOT_SOLVER_WORKERS 大于 1 时，按第一行拆分搜索树并行求解；收集统计时总是串行求解。
+
+    Args:
+        progress (callable): 可选，每进入一个阶段时以阶段名调用（'search'、'count'）。
+        cancel_token (CancellationToken): 可选，搜索中定期检查，被取消时抛出 SearchCancelled。
+        stats (SearchStats): 可选，记录搜索的节点数、分支数、结束状态检查和各阶段耗时。
+
+    Returns:
+        tuple: (dict: 最简洁的方案 {'score', 'method', 'states_path', 'end_state'},
+                int: 所有可能方案的总数,
+                bool: 该方案是否已被证明最优)
+               如果找不到任何方法，则返回 (None, 0, proven_optimal)。
+    """
+    if progress:
+        progress('search')
+
+    search_timing = stats.timing('search') if stats is not None else contextlib.nullcontext()
+    total_solutions = None
+    with search_timing:
+        if time_budget is not None or node_budget is not None:
+            best_solution_obj, proven_optimal = knot_solver.branch_and_bound(
+                start_state, composition_color, time_budget=time_budget, node_budget=node_budget,
+                cancel_token=cancel_token, stats=stats)
+        elif SOLVER_WORKERS > 1 and stats is None:
+            best_solution_obj, total_solutions = knot_solver.solve_optimal_parallel(
+                start_state, composition_color, max_workers=SOLVER_WORKERS, cancel_token=cancel_token)
+            proven_optimal = True
+        else:
+            best_solution_obj = knot_solver.solve_optimal(start_state, composition_color, cancel_token, stats)
+            proven_optimal = True
+    if best_solution_obj is None:
+        return None, 0, proven_optimal
+
+    if total_solutions is None:
+        if progress:
+            progress('count')
+        search_timing = stats.timing('search') if stats is not None else contextlib.nullcontext()
+        with search_timing:
+            total_solutions = knot_solver.count_solutions(start_state, composition_color, cancel_token, stats)
+
+    return best_solution_obj, total_solutions, proven_optimal
+
+
+def format_solution_summary(start_state, best_solution_obj, total_solutions, proven_optimal):
+    """最简洁的方法及其状态路径的可读文本，只在 DEBUG 级别写入日志。"""
+    lines = [
+        "--- 最简洁的编绳方法 ---",
+        f"找到 {total_solutions} 种可能的编绳方法。",
+        f"总简洁度分数: {best_solution_obj['score']}" + ("" if proven_optimal else "（预算用完，未证明最优）"),
+        f"最简洁的打结方式: {best_solution_obj['method']}",
+        f"初始状态: {best_solution_obj['states_path'][0]}",
+    ]
+    for i in range(len(best_solution_obj['method'])):
+        lines.append(f"第 {i+1} 行打结方式: {best_solution_obj['method'][i]}")
+        lines.append(f"更新后状态: {best_solution_obj['states_path'][i+1]}")
+    lines.append(f"结束状态 (end_state): {best_solution_obj['end_state']}")
+    lines.append(f"与初始状态一致: {best_solution_obj['end_state'] == start_state}")
+    return "\n".join(lines)
+
+
+def log_solve(params, result, http_status, seconds=None, cache=None):
+    """
+    每次求解写一条摘要日志：INFO 级别，超时和取消为 WARNING。
+    消息是 'solve ' 加 JSON，同样的字段也以 record.solve 的形式交给结构化的日志处理器。
+
+    Args:
+        params (dict): parse_knot_request 的返回值。
+        result (dict): 响应数据。
+        seconds (float): 求解耗时；批量请求由缓存条目组装响应时为 None。
+        cache (str): 'hit'（结果来自服务进程的缓存）、'miss'（查过缓存但需要计算或等待计算），
+                     不经过缓存或在查缓存之前就被取消时为 None。
+    """
+    level = logging.WARNING if http_status in (499, 504) else logging.INFO
+    if not logger.isEnabledFor(level):
+        return
+    summary = {
+        'pattern': content_key(params['start_state'], params['composition_color'])[:16],
+        'strings': len(params['start_state']),
+        'rows': len(params['composition_color']),
+        'status': http_status,
+        'cache': cache,
+        'seconds': None if seconds is None else round(seconds, 6),
+    }
+    if http_status == 200:
+        summary['totalSolutions'] = result['totalSolutionsText']
+        summary['provenOptimal'] = result['provenOptimal']
+        summary['topK'] = params['top_k']
+    else:
+        summary['error'] = result.get('error')
+    if 'stats' in result:
+        summary['stats'] = result['stats']
+    if result.get('profile') and 'pstats' in result['profile']:
+        summary['profile'] = result['profile']['pstats']
+    logger.log(level, 'solve %s', json.dumps(summary, ensure_ascii=False), extra={'solve': summary})
+
+
+def _compact_solution(solution):
+    """缓存中只保存规范形式下的分数、打结方式和状态路径（颜色已是小整数，方向与请求相同）。"""
+    if solution is None:
+        return None
+    return {
+        'score': solution['score'],
+        'method': tuple(tuple(line) for line in solution['method']),
+        'states_path': tuple(tuple(state) for state in solution['states_path']),
+    }
+
+
+def canonical_request(params):
+    """
+    未设置预算的请求在缓存中的键。
+
+    只做颜色重命名，不做镜像：分数相同的方案之间的取舍与方向有关，与颜色无关，
+    因此在这个形式上求得的方案与直接求解（设置了预算、要求统计或性能分析的请求）完全相同。
+    互为镜像的请求分别缓存。
+
+    Returns:
+        tuple: (缓存键 (规范初始状态, 规范目标图案, topK), canonicalize 返回的变换信息)
+    """
+    (canonical_start, canonical_composition), transform = knot_solver.canonicalize(
+        params['start_state'], params['composition_color'], mirror=False)
+    return (canonical_start, canonical_composition, params['top_k']), transform
+
+
+def solve_cache_entry(cache_key, progress=None, cancel_token=None):
+    """
+    缓存未命中时求解规范问题，结果写入缓存并返回紧凑的缓存条目。
+    批量求解时在工作进程中调用，条目再交回主进程映射成各个请求的结果。
+    """
+    canonical_start, canonical_composition, top_k = cache_key
+    # 键带求解器版本：服务只有给定初始状态的 v5 求解。推断初始状态的 v6 求解（solve_with_inferred_start）
+    # 只在命令行和 knot_solver.solve 中提供，不经过服务，因此不写入存储
+    store_key = content_key('v5', *cache_key)
+    if solution_store is not None:
+        entry = solution_store.get(store_key)
+        if entry is not None:
+            result_cache.put(cache_key, entry)
+            return entry
+
+    canonical_start = list(canonical_start)
+    canonical_composition = [list(line) for line in canonical_composition]
+    with profiling.maybe_profile(canonical_start, canonical_composition):
+        best_solution_obj, total_solutions, _ = generate_knot_methods(
+            canonical_start, canonical_composition, progress=progress, cancel_token=cancel_token)
+        top_solutions = None
+        if top_k is not None and best_solution_obj is not None:
+            if progress:
+                progress('topK')
+            # 流式搜索，只在堆里保留 topK 个方案
+            top_solutions = knot_solver.top_k_solutions(canonical_start, canonical_composition, top_k,
+                                                        cancel_token)
+    entry = {
+        'best': _compact_solution(best_solution_obj),
+        'total': total_solutions,
+        'top': None if top_solutions is None else tuple(_compact_solution(solution)
+                                                        for solution in top_solutions),
+    }
+    result_cache.put(cache_key, entry)
+    if solution_store is not None:
+        solution_store.put(store_key, entry)
+    return entry
+
+
+def _solve_cached(params, progress=None, cancel_token=None):
+    """
+    在规范形式（换色归一，方向不变）上求解并缓存，再映射回请求的颜色。
+
+    先查进程内缓存，再查持久化存储（如果启用）；并发的相同请求合并为一次求解。
+    换色后相同的请求共用同一条缓存。颜色重命名不改变分数相同时的取舍，
+    所以同一个请求无论是否命中缓存、是否要求统计或设置了预算（搜索完成时），都得到与直接求解相同的方案。
+
+    Returns:
+        tuple: (tuple: 与 generate_knot_methods 相同的 (最优方案, 方案总数, 是否已证明最优)
+                       以及 topK 方案列表（未请求时为 None）,
+                str: 'hit' 或 'miss'，即进程内缓存是否命中)
+    """
+    cache_key, transform = canonical_request(params)
+    entry = result_cache.get(cache_key)
+    cache = 'miss' if entry is None else 'hit'
+    while entry is None:
+        # 同一时刻相同的规范问题只有一个请求在算，其余请求等它的结果
+        try:
+            entry = in_flight_solves.do(cache_key, lambda: solve_cache_entry(cache_key, progress, cancel_token),
+                                        cancel_token)
+        except knot_solver.SearchCancelled:
+            # 可能是正在计算的那个请求被取消了；自己没有被取消就重新计算
+            if cancel_token is not None and cancel_token.is_cancelled():
+                raise
+            entry = result_cache.get(cache_key)
+
+    return _restore_entry(entry, transform), cache
+
+
+def cached_entry(params):
+    """
+    可使用缓存的请求在本进程缓存中的 (缓存键, 条目)。后台任务在工作进程中算完后把它交回服务进程，
+    之后相同的请求直接从服务进程的缓存返回。
+
+    Returns:
+        tuple: (缓存键, 缓存条目)；请求不使用缓存或缓存中没有时返回 None。
+    """
+    if not uses_cache(params):
+        return None
+    cache_key, _ = canonical_request(params)
+    entry = result_cache.get(cache_key)
+    return None if entry is None else (cache_key, entry)
+
+
+def _restore_entry(entry, transform):
+    """把规范形式的缓存条目映射回请求的颜色。"""
+    best_solution_obj = knot_solver.restore_solution(entry['best'], transform)
+    top_solutions = None
+    if entry['top'] is not None:
+        top_solutions = [knot_solver.restore_solution(solution, transform) for solution in entry['top']]
+    return best_solution_obj, entry['total'], True, top_solutions
+
+
+def response_from_entry(params, entry, cache=None):
+    """
+    由 solve_cache_entry 返回的缓存条目直接组装请求的响应数据，返回值与 solve_knot_request 相同。
+    cache 为 'hit'（条目取自缓存）或 'miss'（刚刚算出），只用于摘要日志。
+    """
+    _, transform = canonical_request(params)
+    result, http_status = _solution_response(params, *_restore_entry(entry, transform))
+    log_solve(params, result, http_status, cache=cache)
+    return result, http_status
+
+
+def solve_knot_request(params, progress=None, cancel_token=None):
+    """
+    按 parse_knot_request 的结果求解，返回接口的响应数据。
+
+    Args:
+        params (dict): parse_knot_request 的返回值。
+        progress (callable): 可选，每进入一个阶段时以阶段名调用：'cache'（查缓存，仅可使用缓存的请求）、
+                             'search'、'count'、'topK'（仅在需要计算时）和 'format'（组装响应）。
+        cancel_token (CancellationToken): 可选，客户端断开或任务被删除时由调用方取消；
+                                          请求中的 deadline 由调用方在创建它时设置。
+
+    Returns:
+        tuple: (dict: 响应数据, int: HTTP 状态码)；超过截止时间返回 504，被取消返回 499。
+    """
+    started = time.perf_counter()
+    try:
+        result, http_status, cache = _solve_knot_request(params, progress, cancel_token)
+    except knot_solver.SearchCancelled as e:
+        cache = None
+        if e.reason == 'deadline':
+            result, http_status = {'error': '计算超过了截止时间，已停止'}, 504
+        else:
+            result, http_status = {'error': '请求已取消'}, 499
+    log_solve(params, result, http_status, time.perf_counter() - started, cache)
+    return result, http_status
+
+
+def _solve_knot_request(params, progress, cancel_token):
+    """solve_knot_request 的实际求解，另外返回缓存命中情况（见 log_solve 的 cache 参数）。"""
+    start_state = params['start_state']
+    composition_color = params['composition_color']
+    top_k = params['top_k']
+    stats = knot_solver.SearchStats() if params['stats'] else None
+    profile_report = None
+    profiled = False
+    if params['profile']:
+        # 分析器不接受（未启用、超过频率限制或正在分析其他求解）时照常使用缓存，
+        # 客户端不能靠 profile 参数让每个请求都重新搜索
+        skipped = profiling.acquire(requested=True)
+        profiled = skipped is None
+        if not profiled:
+            profile_report = {'skipped': skipped}
+
+    # 调用绳结算法；设置了预算、要求统计或正在分析的请求不使用缓存
+    cache = None
+    if uses_cache(params) and not profiled:
+        if progress:
+            progress('cache')
+        solved, cache = _solve_cached(params, progress=progress, cancel_token=cancel_token)
+    else:
+        if profiled:
+            profile_context = profiling.profile(start_state, composition_color)
+        else:
+            profile_context = profiling.maybe_profile(start_state, composition_color)
+        with profile_context as report:
+            best_solution_obj, total_solutions, proven_optimal = generate_knot_methods(
+                start_state, composition_color, time_budget=params['time_budget'],
+                node_budget=params['node_budget'], progress=progress, cancel_token=cancel_token, stats=stats)
+            top_solutions = None
+            if top_k is not None and best_solution_obj is not None:
+                if progress:
+                    progress('topK')
+                search_timing = stats.timing('search') if stats is not None else contextlib.nullcontext()
+                with search_timing:
+                    top_solutions = knot_solver.top_k_solutions(start_state, composition_color, top_k,
+                                                                cancel_token, stats)
+        if profiled:
+            profile_report = report
+        solved = (best_solution_obj, total_solutions, proven_optimal, top_solutions)
+
+    if progress:
+        progress('format')
+    if stats is None:
+        result, http_status = _solution_response(params, *solved)
+    else:
+        with stats.timing('formatting'):
+            result, http_status = _solution_response(params, *solved)
+        result['stats'] = stats_payload(stats)
+    if params['profile']:
+        result['profile'] = profile_report
+    return result, http_status, cache
+
+
+def stats_payload(stats):
+    """SearchStats 在接口响应中的形式（camelCase 字段名）。"""
+    counters = stats.as_dict()
+    return {
+        'nodesPerRow': counters['nodes_per_row'],
+        'prunedPerRow': counters['pruned_per_row'],
+        'deadEndsPerRow': counters['dead_ends_per_row'],
+        'branchingPerKnot': counters['branching_per_knot'],
+        'closingChecks': counters['closing_checks'],
+        'closingRejections': counters['closing_rejections'],
+        'pathsAtClose': counters['paths_at_close'],
+        'pathsRejectedAtClose': counters['paths_rejected_at_close'],
+        'seconds': counters['seconds'],
+    }
+
+
+def _solution_response(params, best_solution_obj, total_solutions, proven_optimal, top_solutions):
+    """组装接口的响应数据和 HTTP 状态码。"""
+    start_state = params['start_state']
+    if best_solution_obj is None:
+        if not proven_optimal:
+            return {'error': '在给定的预算内未找到符合条件的打结方式', 'provenOptimal': False}, 404
+        return {'error': '未找到符合条件的打结方式'}, 404
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('%s', format_solution_summary(start_state, best_solution_obj, total_solutions, proven_optimal))
+
+    result = {
+        'startState': start_state,
+        'targetPattern': params['composition_color'],
+        'bestSolution': best_solution_obj['method'],
+        'statesPath': best_solution_obj['states_path'],
+        'totalSolutions': total_solutions,
+        # 方案数可能超过 JavaScript 数字的安全整数范围，另附精确的字符串形式
+        'totalSolutionsText': str(total_solutions),
+        'provenOptimal': proven_optimal
+    }
+
+    if top_solutions is not None:
+        result['topSolutions'] = [
+            {
+                'score': solution['score'],
+                'method': solution['method'],
+                'statesPath': solution['states_path']
+            }
+            for solution in top_solutions
+        ]
+
+    return result, 200
+
+
+# warm_up 完成后为 True；/api/ready 据此报告服务是否可以接收请求
+warmed_up = False
+
+
+def warm_up():
+    """
+    加载求解器的各个子模块并求解一个小图案，让第一批请求不必再承担导入和初始化的开销。
+    多进程部署时在 fork 工作进程之前调用，子进程直接继承已加载的模块和颜色编码表。
+    结果不写入缓存和持久化存储。
+    """
+    global warmed_up
+    start_state, composition_color = ['R', 'B', 'G', 'Y'], [['R', 'G'], ['B']]
+    knot_solver.estimate_search_cost(start_state, composition_color, with_top_k=True)
+    knot_solver.canonicalize(start_state, composition_color)
+    knot_solver.solve_optimal(start_state, composition_color)
+    knot_solver.count_solutions(start_state, composition_color)
+    knot_solver.top_k_solutions(start_state, composition_color, 2)
+    knot_solver.branch_and_bound(start_state, composition_color, node_budget=1000)
+    if SOLVER_WORKERS > 1:
+        # 只加载并行求解模块；共享进程池在工作进程中第一次并行求解时创建，不能在 fork 之前创建
+        knot_solver.solve_optimal_parallel
+    warmed_up = True
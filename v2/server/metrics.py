@@ -0,0 +1,151 @@
+"""
+Prometheus 文本格式的运行指标，以及每个请求的分阶段计时（用于 Server-Timing 响应头）。
+
+指标保存在各自进程的内存中；多进程部署时每个工作进程分别提供自己的 /metrics，由 Prometheus 按实例汇总。
+"""
+
+import math
+import time
+import threading
+
+# 请求耗时与求解阶段耗时的分桶上界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# 方案总数的分桶上界：1, 10, 100, ... 10^12
+SOLUTION_COUNT_BUCKETS = tuple(10 ** exponent for exponent in range(13))
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def sample_family(name, documentation, metric_type, samples):
+    """
+    一组指标的文本格式。
+
+    Args:
+        samples (iterable): (标签 dict, 数值) 的序列。
+
+    Returns:
+        list of str: 包括 HELP 和 TYPE 两行在内的各行。
+    """
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} {metric_type}']
+    for labels, value in samples:
+        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    return lines
+
+
+class Histogram:
+    """带标签的累积分桶直方图，线程安全。"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._lock = threading.Lock()
+        # 标签值 tuple -> [各分桶计数（非累积）, 总和, 观测次数]
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        bucket_idx = next(idx for idx, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][bucket_idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self):
+        """按文本格式输出所有序列。"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series_items = sorted((key, (list(counts), total, count))
+                                  for key, (counts, total, count) in self._series.items())
+        for key, (counts, total, count) in series_items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = dict(labels, le=_format_value(float(bound)))
+                lines.append(f'{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {count}')
+        return lines
+
+
+class PhaseTimer:
+    """
+    记录一个请求依次经过的各阶段耗时。可以直接作为 solve_knot_request 的 progress 回调：
+    每次以新阶段名调用时结束上一个阶段。
+
+    Args:
+        forward (callable): 可选，每进入一个阶段时也以阶段名调用它，例如后台任务更新进度。
+    """
+
+    def __init__(self, forward=None):
+        self.forward = forward
+        self.durations = {}
+        self._phase = None
+        self._started = None
+
+    def __call__(self, phase):
+        self.stop()
+        self._phase = phase
+        self._started = time.perf_counter()
+        if self.forward is not None:
+            self.forward(phase)
+
+    def stop(self):
+        """结束当前阶段。"""
+        if self._phase is not None:
+            elapsed = time.perf_counter() - self._started
+            self.durations[self._phase] = self.durations.get(self._phase, 0.0) + elapsed
+            self._phase = None
+
+    def server_timing(self, total=None):
+        """Server-Timing 响应头的值，耗时以毫秒为单位。"""
+        entries = [f'{phase};dur={seconds * 1000:.1f}' for phase, seconds in self.durations.items()]
+        if total is not None:
+            entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
+
+
+# 各接口的请求耗时
+request_latency = Histogram('knot_http_request_duration_seconds', '各接口的请求处理耗时（秒）',
+                            ('endpoint', 'method', 'status'))
+# 求解各阶段的耗时：estimate、cache、search、count、topK、format
+solver_phase_seconds = Histogram('knot_solver_phase_seconds', '求解各阶段的耗时（秒），包括后台任务',
+                                 ('phase', 'source'))
+# 成功求解的方案总数分布
+solution_count = Histogram('knot_solution_count', '成功求解的请求的方案总数', (),
+                           buckets=SOLUTION_COUNT_BUCKETS)
+
+
+def observe_solve(durations, result, http_status, source):
+    """
+    记录一次求解的各阶段耗时和方案总数。
+
+    Args:
+        durations (dict): PhaseTimer.durations。
+        result (dict): solve_knot_request 返回的响应数据。
+        source (str): 'inline'、'job' 或 'batch'。
+    """
+    for phase, seconds in durations.items():
+        solver_phase_seconds.observe(seconds, phase=phase, source=source)
+    if http_status == 200 and result.get('totalSolutions') is not None:
+        # 方案数可能大到无法转换成浮点数，超出最大的分桶后具体数值已不影响分布
+        solution_count.observe(min(result['totalSolutions'], SOLUTION_COUNT_BUCKETS[-1] + 1))
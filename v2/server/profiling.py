@@ -0,0 +1,155 @@
+"""
+按需分析单次求解的性能：请求中给出 "profile": true，或设置 KNOT_PROFILE_SAMPLE_RATE 按比例抽样，
+这次 generate_knot_methods 调用就在 cProfile 和栈采样器下运行，结果写到 KNOT_PROFILE_DIR：
+
+    <图案哈希>-<时间>-<pid>-<序号>.prof         pstats 格式，可用 python -m pstats 或 snakeviz 查看
+    <图案哈希>-<时间>-<pid>-<序号>.collapsed    折叠栈格式（每行 "f1;f2;f3 次数"），可直接交给 flamegraph.pl
+
+没有设置 KNOT_PROFILE_DIR 时不做任何分析。每个进程每分钟最多分析 KNOT_PROFILE_MAX_PER_MINUTE 次，
+同一时刻只分析一个求解，因此即使所有请求都带上 profile 也只有少数会被分析。
+"""
+
+import os
+import sys
+import time
+import random
+import itertools
+import logging
+import cProfile
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+
+from solution_store import content_key
+
+logger = logging.getLogger(__name__)
+
+# 分析结果的输出目录；为空时关闭分析
+PROFILE_DIR = os.environ.get('KNOT_PROFILE_DIR') or None
+# 没有要求分析的求解按这个比例抽样分析
+PROFILE_SAMPLE_RATE = float(os.environ.get('KNOT_PROFILE_SAMPLE_RATE', '0'))
+# 每个进程每分钟最多分析的次数
+PROFILE_MAX_PER_MINUTE = int(os.environ.get('KNOT_PROFILE_MAX_PER_MINUTE', '6'))
+# 栈采样的间隔（秒）
+PROFILE_INTERVAL = float(os.environ.get('KNOT_PROFILE_INTERVAL', '0.005'))
+
+_lock = threading.Lock()
+_recent = deque()
+# 正在分析的求解持有这个锁
+_active = threading.Lock()
+# 同一秒内多次分析同一个图案时用序号区分文件
+_sequence = itertools.count(1)
+
+
+def configure(directory=None, sample_rate=None, max_per_minute=None):
+    """修改当前进程的分析设置，同时写入环境变量，之后启动的工作进程沿用相同的设置。"""
+    global PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_MAX_PER_MINUTE
+    if directory is not None:
+        PROFILE_DIR = directory
+        os.environ['KNOT_PROFILE_DIR'] = directory
+    if sample_rate is not None:
+        PROFILE_SAMPLE_RATE = sample_rate
+        os.environ['KNOT_PROFILE_SAMPLE_RATE'] = str(sample_rate)
+    if max_per_minute is not None:
+        PROFILE_MAX_PER_MINUTE = max_per_minute
+        os.environ['KNOT_PROFILE_MAX_PER_MINUTE'] = str(max_per_minute)
+
+
+def acquire(requested=False):
+    """
+    决定这次求解是否分析。
+
+    Returns:
+        str: 不分析的原因（'disabled'、'not_sampled'、'rate_limited' 或 'busy'）；返回 None 时调用方
+             已经占用了分析器，必须接着用 profile() 运行求解，它结束时释放分析器。
+    """
+    if PROFILE_DIR is None:
+        return 'disabled'
+    if not requested and random.random() >= PROFILE_SAMPLE_RATE:
+        return 'not_sampled'
+    with _lock:
+        now = time.monotonic()
+        while _recent and now - _recent[0] > 60:
+            _recent.popleft()
+        if len(_recent) >= PROFILE_MAX_PER_MINUTE:
+            return 'rate_limited'
+        # cProfile 同一时刻只能有一个在运行
+        if not _active.acquire(blocking=False):
+            return 'busy'
+        _recent.append(now)
+    return None
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def _sample_stacks(thread_id, stop, interval):
+    """在后台线程中定期读取 thread_id 线程的调用栈，返回折叠栈 -> 采样次数。"""
+    stacks = Counter()
+    while not stop.wait(interval):
+        frame = sys._current_frames().get(thread_id)
+        labels = []
+        while frame is not None:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        if labels:
+            stacks[';'.join(reversed(labels))] += 1
+    return stacks
+
+
+@contextmanager
+def maybe_profile(start_state, composition_color, requested=False):
+    """
+    决定是否分析代码块中的求解，需要时在 cProfile 和栈采样器下运行它。
+
+    Yields:
+        dict: 分析报告，见 profile()；不分析时为 {'skipped': acquire() 返回的原因}。
+    """
+    reason = acquire(requested)
+    if reason is not None:
+        yield {'skipped': reason}
+        return
+    with profile(start_state, composition_color) as report:
+        yield report
+
+
+@contextmanager
+def profile(start_state, composition_color):
+    """
+    在 cProfile 和栈采样器下运行代码块中的求解，结束时写出结果并释放分析器。调用前 acquire() 必须返回 None。
+
+    Yields:
+        dict: 分析报告，代码块结束后填入 {'pstats', 'collapsed', 'samples'}（文件路径和采样次数）。
+    """
+    report = {}
+    try:
+        thread_id = threading.get_ident()
+        stop = threading.Event()
+        stacks = Counter()
+        sampler = threading.Thread(
+            target=lambda: stacks.update(_sample_stacks(thread_id, stop, PROFILE_INTERVAL)), daemon=True)
+        profiler = cProfile.Profile()
+        sampler.start()
+        profiler.enable()
+        try:
+            yield report
+        finally:
+            profiler.disable()
+            stop.set()
+            sampler.join()
+
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            pattern_hash = content_key(start_state, composition_color)[:16]
+            name = f"{pattern_hash}-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{next(_sequence)}"
+            base = os.path.join(PROFILE_DIR, name)
+            profiler.dump_stats(base + '.prof')
+            with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f'{stack} {count}\n')
+            report.update({'pstats': base + '.prof', 'collapsed': base + '.collapsed',
+                           'samples': sum(stacks.values())})
+            logger.info('profile written to %s.{prof,collapsed}', base)
+    finally:
+        _active.release()
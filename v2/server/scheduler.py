@@ -0,0 +1,92 @@
+"""
+后台任务的调度顺序：按预计耗时分成几条优先级通道，短任务优先；
+排队越久优先级越高（老化），保证长任务最终也能执行；同一个客户端同时运行的任务数有上限。
+"""
+
+import time
+import itertools
+
+# 预计耗时不超过 LANE_LIMITS[i] 秒的任务进入第 i 条通道，更长的进入最后一条
+LANE_LIMITS = (1.0, 10.0)
+
+
+def lane_for(estimated_seconds):
+    for lane, limit in enumerate(LANE_LIMITS):
+        if estimated_seconds <= limit:
+            return lane
+    return len(LANE_LIMITS)
+
+
+class JobScheduler:
+    """
+    保存排队中的任务并决定下一个运行哪一个。本身不加锁，由 JobManager 在持有锁时调用。
+
+    排序键为 (通道 - 已等待时间 // aging_seconds, 预计耗时, 提交顺序)：
+    同一通道内预计耗时短的先运行；每等待 aging_seconds 秒提升一条通道，并且可以一直提升到
+    比新提交的短任务更靠前。
+    """
+
+    def __init__(self, aging_seconds=30.0, max_running_per_client=2):
+        self.aging_seconds = aging_seconds
+        self.max_running_per_client = max_running_per_client
+        self._queued = {}
+        self._running_by_client = {}
+        self._sequence = itertools.count()
+
+    def __len__(self):
+        return len(self._queued)
+
+    def push(self, job_id, estimated_seconds, client_id=None):
+        self._queued[job_id] = (lane_for(estimated_seconds), estimated_seconds,
+                                next(self._sequence), time.monotonic(), client_id)
+
+    def _priority(self, entry, now):
+        lane, estimated_seconds, sequence, queued_at, _ = entry
+        promoted = int((now - queued_at) // self.aging_seconds) if self.aging_seconds > 0 else 0
+        return lane - promoted, estimated_seconds, sequence
+
+    def remove(self, job_id):
+        """从队列中移除还没开始运行的任务；任务不在队列中时返回 False。"""
+        return self._queued.pop(job_id, None) is not None
+
+    def pop_next(self):
+        """
+        取出下一个可以运行的任务并记为运行中。
+
+        Returns:
+            str: 任务 id；没有排队的任务，或排队的任务所属客户端都已达到并发上限时返回 None。
+        """
+        now = time.monotonic()
+        best_job_id, best_priority = None, None
+        for job_id, entry in self._queued.items():
+            client_id = entry[4]
+            if client_id is not None and \
+                    self._running_by_client.get(client_id, 0) >= self.max_running_per_client:
+                continue
+            priority = self._priority(entry, now)
+            if best_priority is None or priority < best_priority:
+                best_job_id, best_priority = job_id, priority
+
+        if best_job_id is None:
+            return None
+        client_id = self._queued.pop(best_job_id)[4]
+        if client_id is not None:
+            self._running_by_client[client_id] = self._running_by_client.get(client_id, 0) + 1
+        return best_job_id
+
+    def finished(self, client_id):
+        """运行中的任务结束时调用，释放客户端的并发名额。"""
+        if client_id is None:
+            return
+        remaining = self._running_by_client.get(client_id, 0) - 1
+        if remaining > 0:
+            self._running_by_client[client_id] = remaining
+        else:
+            self._running_by_client.pop(client_id, None)
+
+    def lane_counts(self):
+        """各通道排队中的任务数。"""
+        counts = [0] * (len(LANE_LIMITS) + 1)
+        for entry in self._queued.values():
+            counts[entry[0]] += 1
+        return counts
@@ -0,0 +1,67 @@
+"""
+合并同时到达的相同请求：同一个键同一时刻只计算一次，其余请求等待并共享结果。
+"""
+
+import threading
+
+from knot_solver import SearchCancelled
+
+# 等待者每隔这么多秒检查一次自己是否已被取消
+WAIT_SLICE = 0.05
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """按键合并并发调用；计算结束后立即忘掉这个键，不缓存结果。"""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, cancel_token=None):
+        """
+        调用 fn() 并返回结果。如果相同 key 的调用正在进行，等待它结束并返回同一个结果，
+        它抛出的异常也会在每个等待者处重新抛出。
+
+        Args:
+            cancel_token (CancellationToken): 可选，等待者的取消标志；等待期间被取消（客户端断开或超过截止时间）
+                                              时不再等待，抛出 SearchCancelled，正在进行的计算不受影响。
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            while not call.done.wait(WAIT_SLICE if cancel_token is not None else None):
+                if cancel_token.is_cancelled():
+                    raise SearchCancelled(cancel_token.reason)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,122 @@
+"""
+跨进程、可持久化的求解结果存储，保存在本地 SQLite 文件中。
+
+多个服务进程可以同时打开同一个文件（WAL 模式下读写互不阻塞），
+服务重启之后已经算过的图案可以直接读出结果。
+键是规范化问题的内容哈希，总大小超过上限时按最久未访问的顺序删除。
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS solutions_accessed_at ON solutions (accessed_at);
+"""
+
+
+def content_key(*parts):
+    """把可 JSON 序列化的键内容哈希成定长字符串。"""
+    text = json.dumps(parts, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class SolutionStore:
+    """
+    SQLite 上的键值存储，值为可 JSON 序列化的对象。
+
+    每个线程使用自己的连接；读写出错时只打印警告并当作未命中，不影响求解。
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, busy_timeout=5.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        # 连接不能跨进程使用，fork 出来的子进程需要重新打开
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.executescript(_SCHEMA)
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        """返回 key 对应的值；不存在或读取失败时返回 None。"""
+        try:
+            connection = self._connect()
+            row = connection.execute('SELECT payload FROM solutions WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute('UPDATE solutions SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            return json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning("读取结果存储失败: %s", e)
+            return None
+
+    def put(self, key, value):
+        payload = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            connection = self._connect()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.execute(
+                    'INSERT OR REPLACE INTO solutions (key, payload, size, created_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?)', (key, payload, size, now, now))
+                self._evict(connection)
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.warning("写入结果存储失败: %s", e)
+
+    def _evict(self, connection):
+        """总大小超过 max_bytes 时，从最久未访问的条目开始删除。"""
+        total_size = connection.execute('SELECT COALESCE(SUM(size), 0) FROM solutions').fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in connection.execute('SELECT key, size FROM solutions ORDER BY accessed_at'):
+            if total_size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total_size -= size
+        connection.executemany('DELETE FROM solutions WHERE key = ?', evicted)
+
+    def stats(self):
+        try:
+            connection = self._connect()
+            count, total_size = connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM solutions').fetchone()
+        except sqlite3.Error as e:
+            logger.warning("读取结果存储失败: %s", e)
+            return {'path': self.path, 'error': str(e)}
+        return {'path': self.path, 'entries': count, 'bytes': total_size, 'maxBytes': self.max_bytes}
@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 """
 手绳编织助手后端服务启动脚本
+
+    python start_server.py                  开发模式：Flask 调试服务器，修改代码后自动重启
+    python start_server.py --production     生产模式：gunicorn 多线程 WSGI 服务器，
+                                            在开始接收请求之前加载并预热求解器
+
+依赖已经满足时不再运行 pip，--install 强制重新安装。
 """
 
 import os
+import re
 import sys
+import argparse
 import subprocess
-import time
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server")
 
 def check_python_version():
     """检查Python版本"""
@@ -15,12 +24,58 @@ def check_python_version():
         sys.exit(1)
     print(f"Python版本: {sys.version}")
 
-def install_requirements():
-    """安装依赖包"""
+def read_requirements(path):
+    """读取 requirements 文件中的依赖，展开用 -r 引用的文件"""
+    requirements = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith(("-r ", "--requirement ")):
+                included = line.split(None, 1)[1]
+                requirements += read_requirements(os.path.join(os.path.dirname(path), included))
+            else:
+                requirements.append(line)
+    return requirements
+
+# requirements 文件中使用的写法：固定版本，可选地带一个 sys_platform 条件
+PINNED_REQUIREMENT = re.compile(
+    r'^([A-Za-z0-9._-]+)==([^\s;]+)\s*(?:;\s*sys_platform\s*(==|!=)\s*["\']([^"\']+)["\'])?$')
+
+def requirements_satisfied(path):
+    """
+    requirements 文件中的依赖是否都已安装且版本符合要求；无法判断时返回 False。
+    只用标准库检查 name==version 形式的固定版本，不依赖 packaging 等尚未安装的包。
+    """
+    try:
+        from importlib import metadata
+    except ImportError:
+        return False
+    for line in read_requirements(path):
+        match = PINNED_REQUIREMENT.match(line)
+        if match is None:
+            return False
+        name, version, operator, platform = match.groups()
+        if operator is not None and (sys.platform == platform) != (operator == "=="):
+            continue
+        try:
+            if metadata.version(name) != version:
+                return False
+        except metadata.PackageNotFoundError:
+            return False
+    return True
+
+def install_requirements(requirements_file, force=False):
+    """安装依赖包；已经满足时跳过"""
+    path = os.path.join(SERVER_DIR, requirements_file)
+    if not force and requirements_satisfied(path):
+        print("依赖包已满足，跳过安装")
+        return
     print("正在安装依赖包...")
     try:
         subprocess.check_call([
-            sys.executable, "-m", "pip", "install", "-r", "server/requirements.txt"
+            sys.executable, "-m", "pip", "install", "-r", path
         ])
         print("依赖包安装完成")
     except subprocess.CalledProcessError as e:
@@ -31,33 +86,111 @@ def start_server():
     """启动Flask服务器"""
     print("正在启动Flask服务器...")
     try:
-        # 切换到server目录
-        os.chdir("server")
-        
-        # 启动服务器
+        # 在server目录中启动服务器
         subprocess.run([
             sys.executable, "app.py"
-        ])
+        ], cwd=SERVER_DIR)
     except KeyboardInterrupt:
         print("\n服务器已停止")
     except Exception as e:
         print(f"启动服务器失败: {e}")
         sys.exit(1)
 
+def load_app():
+    """导入 Flask 应用并预热求解器，返回 WSGI 应用"""
+    sys.path.insert(0, SERVER_DIR)
+    import knot_service
+    from app import app
+    knot_service.warm_up()
+    return app
+
+def report_ready(host, port, ready_file=None):
+    """预热完成、开始监听端口后报告就绪；给出 ready_file 时写入主进程 pid，供进程管理工具检查"""
+    if ready_file:
+        with open(ready_file, "w", encoding="utf-8") as f:
+            f.write(f"{os.getpid()}\n")
+    print(f"服务已就绪: http://{host}:{port}", flush=True)
+
+def start_production_server(host, port, workers, threads, ready_file=None):
+    """
+    启动生产模式服务器。
+
+    使用 gunicorn 的 preload 模式：主进程先导入应用并预热求解器，再 fork 出 workers 个工作进程，
+    每个工作进程用 threads 个线程处理请求。Windows 上没有 gunicorn，改为单进程多线程的 werkzeug 服务器。
+
+    后台任务只保存在创建它的进程中，客户端轮询 /api/jobs/<jobId> 必须落到同一个进程，
+    因此默认只用一个工作进程；求解本身在后台任务和批量求解的进程池中进行，不受线程数限制。
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        BaseApplication = None
+
+    if BaseApplication is None:
+        print("gunicorn 不可用，使用单进程多线程服务器")
+        from werkzeug.serving import run_simple
+        app = load_app()
+        report_ready(host, port, ready_file)
+        run_simple(host, port, app, threaded=True)
+        return
+
+    class ProductionServer(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_app()
+
+    if workers > 1:
+        print("警告：后台任务保存在各自的工作进程中，多个工作进程时需要在负载均衡器上按客户端固定转发")
+    print(f"正在启动生产服务器: {workers} 个工作进程，每个 {threads} 个线程...")
+    ProductionServer({
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread",
+        "preload_app": True,
+        # 直接计算的请求最长可以运行 KNOT_REQUEST_DEADLINE 秒，工作进程的超时要比它长
+        "timeout": int(float(os.environ.get("KNOT_REQUEST_DEADLINE", "60"))) + 30,
+        "when_ready": lambda server: report_ready(host, port, ready_file),
+    }).run()
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="手绳编织助手后端服务")
+    parser.add_argument("--production", action="store_true",
+                        help="生产模式：多进程 WSGI 服务器，不使用调试模式和自动重启")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="生产模式的工作进程数，默认为 1；后台任务只保存在创建它的进程中，"
+                             "多于 1 个时需要按客户端固定转发")
+    parser.add_argument("--threads", type=int, default=8, help="生产模式每个工作进程的线程数")
+    parser.add_argument("--ready-file", default=None, help="生产模式就绪后把主进程 pid 写入这个文件")
+    parser.add_argument("--install", action="store_true", help="即使依赖已满足也重新安装")
+    args = parser.parse_args()
+
     print("=" * 50)
     print("手绳编织助手后端服务")
     print("=" * 50)
-    
+
     # 检查Python版本
     check_python_version()
-    
+
     # 安装依赖
-    install_requirements()
-    
+    install_requirements("requirements-prod.txt" if args.production else "requirements.txt",
+                         force=args.install)
+
     # 启动服务器
-    start_server()
+    if args.production:
+        start_production_server(args.host, args.port, args.workers, args.threads, args.ready_file)
+    else:
+        start_server()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()